@@ -379,6 +379,7 @@ class GomokuSinglePlayer:
         """
         dialog.destroy()
         self.root.destroy()
+        AIManager.close_ai(self.ai)
         
         # Import and show main menu
         from main import GomokuMenu
@@ -489,9 +490,14 @@ class GomokuSinglePlayer:
         self.game.reset()
         self.game_active = True
         # Recreate AI with current difficulty
-        self.ai = AIManager.get_ai(self.game, self.difficulty, self.ai_symbol)
+        self.replace_ai()
         self.update_status("Your turn! (You are Black/X)", 'darkgreen')
     
+    def replace_ai(self):
+        """Swap in a fresh AI for the current difficulty, closing the old one"""
+        AIManager.close_ai(self.ai)
+        self.ai = AIManager.get_ai(self.game, self.difficulty, self.ai_symbol)
+    
     def change_difficulty(self, new_difficulty):
         """Change AI difficulty level"""
         self.difficulty = new_difficulty
@@ -508,7 +514,7 @@ class GomokuSinglePlayer:
                 self.new_game()
         else:
             # Just update AI for next game
-            self.ai = AIManager.get_ai(self.game, self.difficulty, self.ai_symbol)
+            self.replace_ai()
     
     def update_status(self, text, color='black'):
         """Update status label"""
@@ -594,8 +600,7 @@ class GomokuSinglePlayer:
         
         try:
             # Restore game state
-            self.game.board = state['board']
-            self.game.board_size = state['board_size']
+            self.game.load_board(state['board'])
             self.game.current_player = state['current_player']
             self.game.game_over = state['game_over']
             self.game.winner = state['winner']
@@ -604,7 +609,7 @@ class GomokuSinglePlayer:
             self.difficulty = state['ai_difficulty']
             self.difficulty_var.set(self.difficulty)
             self.diff_info_label.config(text=AIManager.get_description(self.difficulty))
-            self.ai = AIManager.get_ai(self.game, self.difficulty, self.ai_symbol)
+            self.replace_ai()
             
             # Redraw board
             self.canvas.delete('all')
@@ -731,6 +736,7 @@ class GomokuSinglePlayer:
         """Run the game"""
         self.root.protocol("WM_DELETE_WINDOW", self.quit_game)
         self.root.mainloop()
+        AIManager.close_ai(self.ai)
 
 
 if __name__ == "__main__":
@@ -68,6 +68,19 @@ class AIManager:
         
         return ai_class(game, **kwargs)
     
+    @staticmethod
+    def close_ai(ai):
+        """
+        Release what an AI instance holds (worker processes) once it is
+        replaced or the game ends
+        
+        Args:
+            ai: AI instance from get_ai, or None
+        """
+        close = getattr(ai, 'close', None)
+        if close is not None:
+            close()
+    
     @staticmethod
     def get_difficulty_list():
         """
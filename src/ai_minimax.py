@@ -3,9 +3,161 @@ Minimax AI with Alpha-Beta Pruning for Gomoku
 Implements strategic gameplay using search algorithms
 """
 
-import copy
+import random
 from typing import Tuple, List, Optional
 
+# Integer search bound; keeps alpha/beta comparisons int-vs-int
+_INF = 10**9
+
+# Cell codes of the padded search board
+EMPTY = 0
+STONE_X = 1
+STONE_O = 2
+BORDER = 3  # Off-board sentinel; blocks runs like an opponent stone
+
+CELL_CODES = {' ': EMPTY, 'X': STONE_X, 'O': STONE_O}
+
+# Border width around the search board, wide enough that run scans and
+# move neighborhoods never need bounds checks
+_PAD = 4
+
+# Maps cell codes to base-3 digit characters, so a whole line packs into
+# its integer key with one C-level int() parse
+_DIGITS = bytes.maketrans(b'\x00\x01\x02', b'012')
+
+# Zobrist key width. 60 bits is two internal digits of a Python int, so
+# hash XORs and compares stay on the small-int fast path (64-bit keys
+# take three)
+_ZOBRIST_BITS = 60
+
+# Transposition table entry flags: how the stored score bounds the true one
+TT_EXACT = 0
+TT_LOWER = 1  # Search failed high; true score >= stored
+TT_UPPER = 2  # Search failed low; true score <= stored
+
+
+class BoardGeometry:
+    """
+    Index tables for the padded search board of one board size
+    Built once per size and shared by every AI instance
+    """
+    
+    _cache = {}
+    
+    @classmethod
+    def for_size(cls, size: int) -> 'BoardGeometry':
+        """Get the (cached) geometry for a board size"""
+        geometry = cls._cache.get(size)
+        if geometry is None:
+            geometry = cls._cache[size] = cls(size)
+        return geometry
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.width = size + 2 * _PAD
+        self.steps = (1, self.width, self.width + 1, self.width - 1)
+        
+        # Empty board framed by the BORDER margin, copied per search
+        self.template = bytearray([BORDER]) * (self.width * self.width)
+        self.coords = [None] * len(self.template)
+        for row in range(size):
+            for col in range(size):
+                idx = self.index(row, col)
+                self.template[idx] = EMPTY
+                self.coords[idx] = (row, col)
+        
+        # Every row, column and diagonal as a tuple of flat indices (and
+        # as a slice of the board), and for each cell the (line id,
+        # weight) of the four lines through it - exactly what a move
+        # there has to rescore.
+        #
+        # A line's contents pack into one integer key: cell i adds
+        # code * 3**i (its weight), on top of a leading 3**len(line)
+        # digit so lines of different lengths never share a key. Base 3
+        # is the tightest packing of three cell states: a full 15-cell
+        # line stays below 2**30, a single internal digit of a Python
+        # int, where 2 bits per cell would need two.
+        self.line_cells = []
+        self.line_slices = []
+        self.line_base = []
+        self.cell_lines = [()] * len(self.template)
+        self._build_lines()
+        
+        # Zobrist keys: one flat list per cell code, indexed like the
+        # board; border cells never hold a stone, but a full-size list
+        # keeps the lookup a plain index. Fixed seed so hashes are
+        # reproducible between runs.
+        rng = random.Random(size)
+        self.zobrist = [None] + [
+            [rng.getrandbits(_ZOBRIST_BITS) for _ in self.template]
+            for _ in (STONE_X, STONE_O)
+        ]
+        
+        self._neighborhoods = {}  # radius -> index offsets
+        
+        # The board's seven non-identity rotations and reflections, each
+        # as the index every cell maps to (border cells map to themselves)
+        last = size - 1
+        self.symmetries = []
+        for transform in (
+            lambda r, c: (c, last - r),
+            lambda r, c: (last - r, last - c),
+            lambda r, c: (last - c, r),
+            lambda r, c: (r, last - c),
+            lambda r, c: (last - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (last - c, last - r),
+        ):
+            perm = list(range(len(self.template)))
+            for idx, coords in enumerate(self.coords):
+                if coords is not None:
+                    perm[idx] = self.index(*transform(*coords))
+            self.symmetries.append(perm)
+    
+    def index(self, row: int, col: int) -> int:
+        """Flat index of a board cell in the padded search board"""
+        return (row + _PAD) * self.width + col + _PAD
+    
+    def neighborhood(self, radius: int) -> List[int]:
+        """Index offsets of the square neighborhood of a cell"""
+        offsets = self._neighborhoods.get(radius)
+        if offsets is None:
+            offsets = [dr * self.width + dc
+                       for dr in range(-radius, radius + 1)
+                       for dc in range(-radius, radius + 1)]
+            self._neighborhoods[radius] = offsets
+        return offsets
+    
+    def _build_lines(self):
+        """Split the search board into lines along the four directions"""
+        cells = self.template
+        affected = {}
+        for start, coords in enumerate(self.coords):
+            if coords is None:
+                continue
+            for step in self.steps:
+                # A line starts at the first cell after the border
+                if cells[start - step] != BORDER:
+                    continue
+                line = []
+                idx = start
+                while cells[idx] != BORDER:
+                    line.append(idx)
+                    idx += step
+                lid = len(self.line_cells)
+                line = tuple(line)
+                self.line_cells.append(line)
+                self.line_slices.append(slice(line[0], line[-1] + 1, step))
+                self.line_base.append(3 ** len(line))
+                for pos, idx in enumerate(line):
+                    affected.setdefault(idx, {})[step] = (lid, 3 ** pos)
+        
+        # Keep each cell's lines in direction order
+        for idx, by_step in affected.items():
+            self.cell_lines[idx] = tuple(by_step[step] for step in self.steps)
+        self.cell_line_ids = [tuple(lid for lid, _ in lines)
+                              for lines in self.cell_lines]
+
 
 class MinimaxAI:
     """
@@ -22,6 +174,24 @@ class MinimaxAI:
     OPEN_TWO = 10       # Two in a row with both ends open
     BLOCKED_TWO = 1     # Two in a row with one end blocked
     
+    # Late move reduction: moves after the first few are searched shallower
+    LMR_FULL_MOVES = 3  # Moves always searched to full depth
+    LMR_MIN_DEPTH = 3   # Only reduce when at least this much depth remains
+    
+    # Half-width of the iterative deepening aspiration window. Scores swing
+    # between odd and even depths by up to a blocked four, so narrower
+    # windows mostly just fail and re-search.
+    ASPIRATION_WINDOW = 5000
+    
+    # Candidate moves are empty cells within this radius of a stone
+    NEARBY_RADIUS = 2
+    
+    # Transposition table size (entries, as a power of two)
+    TT_BITS = 20
+    
+    # Line score tables, keyed by the run scores they were built with
+    _line_tables = {}
+    
     def __init__(self, game, player='O', depth=3, use_alpha_beta=True):
         """
         Initialize Minimax AI
@@ -38,7 +208,72 @@ class MinimaxAI:
         self.depth = depth
         self.use_alpha_beta = use_alpha_beta
         self.nodes_evaluated = 0  # For performance tracking
-        self.board_score_cache = {}  # Cache for board evaluations
+        
+        # Flat copy of the board framed by a BORDER margin. Neighbors in
+        # the four line directions are a fixed index step apart, and
+        # nothing on the hot path needs to bounds-check.
+        geometry = BoardGeometry.for_size(game.board_size)
+        self._geometry = geometry
+        self._index = geometry.index
+        self._steps = geometry.steps
+        self._cell_coords = geometry.coords
+        self._line_cells = geometry.line_cells
+        self._cell_lines = geometry.cell_lines
+        self._cell_line_ids = geometry.cell_line_ids
+        self.cells = bytearray(geometry.template)
+        
+        self._run_scores = (
+            (0, 0),
+            (0, 0),
+            (self.BLOCKED_TWO, self.OPEN_TWO),
+            (self.BLOCKED_THREE, self.OPEN_THREE),
+            (self.BLOCKED_FOUR, self.OPEN_FOUR),
+            (self.FIVE, self.FIVE),
+        )
+        
+        # Pattern score of every line, one array per player, plus the
+        # running totals indexed by cell code. A move only changes the
+        # four lines through it, so evaluation is kept up to date
+        # incrementally instead of rescanning the board at every leaf.
+        self.line_scores_x = [0] * len(self._line_cells)
+        self.line_scores_o = [0] * len(self._line_cells)
+        self.pattern_totals = [0, 0, 0]
+        
+        # Stones on the search board, so a full board is an O(1) check
+        self.stone_count = 0
+        self._board_cells = game.board_size * game.board_size
+        
+        # Per search ply, the stone placed and the candidate counts of the
+        # resulting position (filled in the first time it is expanded)
+        self._nearby_offsets = geometry.neighborhood(self.NEARBY_RADIUS)
+        self._nearby_stack = [[None, None]]
+        
+        # Move ordering memory for the current search: two killer moves
+        # per ply (recent cutoff moves, tried early at the same ply) and
+        # a history score per cell, raised by depth squared on every
+        # cutoff the cell causes
+        self.killers = [[0, 0] for _ in range(depth + 2)]
+        self.history = [0] * len(geometry.template)
+        
+        # Packed key of every line and the (X score, O score) of each key
+        # seen so far. Most lines repeat across the tree, so a move
+        # usually rescores its four lines with four dict hits. The table
+        # only depends on the scoring constants, so every AI using the
+        # same constants shares it and later games start with it warm.
+        self.line_keys = list(geometry.line_base)
+        self._line_slices = geometry.line_slices
+        self._line_table = self._line_tables.setdefault(self._run_scores, {})
+        
+        # Zobrist hash of the search board, kept up to date by _place and
+        # _remove, and a fixed-size transposition table indexed by its low
+        # bits. Two parallel lists hold the full hash and the packed entry
+        # (score << 22 | best move << 10 | depth << 2 | flag), so probes allocate nothing and
+        # the table never grows. Entries stay valid across moves.
+        self._zobrist = geometry.zobrist
+        self.zobrist_hash = 0
+        self._tt_mask = (1 << self.TT_BITS) - 1
+        self._tt_keys = [-1] * (1 << self.TT_BITS)
+        self._tt_entries = [0] * (1 << self.TT_BITS)
         
     def make_move(self) -> Optional[Tuple[int, int]]:
         """
@@ -48,12 +283,158 @@ class MinimaxAI:
             (row, col) tuple or None if no valid moves
         """
         self.nodes_evaluated = 0
-        self.board_score_cache.clear()  # Clear cache for new search
         best_move = self.get_best_move()
         print(f"[AI] Evaluated {self.nodes_evaluated} nodes, depth={self.depth}")
-        print(f"[AI] Cache size: {len(self.board_score_cache)} positions")
         return best_move
     
+    def initialize_ai_state(self):
+        """
+        Rebuild the search board from the game board
+        
+        The game board can change between AI moves (player moves, loading
+        a save), so this runs at the start of every search.
+        """
+        cells = self.cells
+        board = self.game.board
+        for row in range(self.game.board_size):
+            start = self._index(row, 0)
+            cells[start:start + len(board[row])] = bytes(
+                CELL_CODES[cell] for cell in board[row]
+            )
+        
+        # Key and score every line from scratch. Cell i is the i-th base-3
+        # digit of the key, so the reversed line is the key's numeral.
+        table = self._line_table
+        totals = [0, 0, 0]
+        for lid, line_slice in enumerate(self._line_slices):
+            segment = cells[line_slice]
+            key = self._geometry.line_base[lid] + int(
+                segment[::-1].translate(_DIGITS), 3
+            )
+            self.line_keys[lid] = key
+            
+            scores = table.get(key)
+            if scores is None:
+                scores = table[key] = self._score_line(segment)
+            score_x, score_o = scores
+            self.line_scores_x[lid] = score_x
+            self.line_scores_o[lid] = score_o
+            totals[STONE_X] += score_x
+            totals[STONE_O] += score_o
+        self.pattern_totals = totals
+        self.stone_count = self._board_cells - cells.count(EMPTY)
+        self._nearby_stack = [[None, None]]
+        
+        zobrist_hash = 0
+        for code in (STONE_X, STONE_O):
+            keys = self._zobrist[code]
+            idx = cells.find(code)
+            while idx != -1:
+                zobrist_hash ^= keys[idx]
+                idx = cells.find(code, idx + 1)
+        self.zobrist_hash = zobrist_hash
+    
+    def _score_line(self, segment) -> Tuple[int, int]:
+        """
+        Score every run on one line for both players
+        
+        Args:
+            segment: Cell codes of the line, in order
+            
+        Returns:
+            (X score, O score)
+        """
+        run_scores = self._run_scores
+        scores = [0, 0, 0, 0]
+        run_code = EMPTY
+        length = 0
+        start_open = False
+        prev = BORDER
+        
+        for cell in segment:
+            if cell == run_code and cell != EMPTY:
+                length += 1
+                continue
+            if length >= 2:
+                both_open = start_open and cell == EMPTY
+                scores[run_code] += run_scores[min(length, 5)][both_open]
+            if cell == EMPTY:
+                length = 0
+            else:
+                # New run; its start is open only after an empty cell
+                start_open = prev == EMPTY
+                length = 1
+            run_code = cell
+            prev = cell
+        
+        # The line end blocks a run reaching it
+        if length >= 2:
+            scores[run_code] += run_scores[min(length, 5)][False]
+        
+        return scores[STONE_X], scores[STONE_O]
+    
+    def _apply_move(self, row: int, col: int, player: str):
+        """Place a stone on the search board (the game board is untouched)"""
+        self._place(self._index(row, col), CELL_CODES[player])
+    
+    def _undo_move(self, row: int, col: int):
+        """Remove a stone placed by _apply_move"""
+        self._remove(self._index(row, col))
+    
+    def _place(self, idx: int, code: int):
+        """
+        Put a stone code on a search board index, keeping the line scores
+        in sync
+        """
+        self.cells[idx] = code
+        self.stone_count += 1
+        self.zobrist_hash ^= self._zobrist[code][idx]
+        self._shift_lines(idx, code)
+        self._nearby_stack.append([idx, None])
+    
+    def _remove(self, idx: int):
+        """Take back the stone put on a search board index by _place"""
+        code = self.cells[idx]
+        self.cells[idx] = EMPTY
+        self.stone_count -= 1
+        self.zobrist_hash ^= self._zobrist[code][idx]
+        self._shift_lines(idx, -code)
+        self._nearby_stack.pop()
+    
+    def _shift_lines(self, idx: int, delta: int):
+        """
+        Rescore the four lines through a cell after its code changed by
+        delta
+        
+        Scores are looked up by the lines' new keys rather than restored
+        from an undo log: a removal always returns a line to a key that
+        is already in the table, so undoing a move allocates nothing.
+        """
+        keys = self.line_keys
+        table = self._line_table
+        scores_x = self.line_scores_x
+        scores_o = self.line_scores_o
+        
+        # Sum the four lines' changes locally and touch the totals once
+        change_x = change_o = 0
+        for lid, weight in self._cell_lines[idx]:
+            key = keys[lid] + delta * weight
+            keys[lid] = key
+            scores = table.get(key)
+            if scores is None:
+                scores = table[key] = self._score_line(
+                    self.cells[self._line_slices[lid]])
+            new_x, new_o = scores
+            
+            change_x += new_x - scores_x[lid]
+            change_o += new_o - scores_o[lid]
+            scores_x[lid] = new_x
+            scores_o[lid] = new_o
+        
+        totals = self.pattern_totals
+        totals[STONE_X] += change_x
+        totals[STONE_O] += change_o
+    
     def get_best_move(self) -> Optional[Tuple[int, int]]:
         """
         Get best move using minimax with alpha-beta pruning
@@ -61,172 +442,291 @@ class MinimaxAI:
         Returns:
             Best (row, col) move or None
         """
-        legal_moves = self.get_legal_moves_nearby()
+        self.initialize_ai_state()
+        counts = self._nearby_counts()
         
-        if not legal_moves:
+        if not counts:
             return None
+        coords = self._cell_coords
+        
+        self.killers = [[0, 0] for _ in range(self.depth + 2)]
+        self.history = [0] * len(self.history)
+        
+        code = CELL_CODES[self.player]
+        candidates = self._order_cells(counts, code)
         
         # Quick win check - if we can win in one move, take it
-        for move in legal_moves:
-            if self.is_winning_move(move, self.player):
-                return move
+        for idx in candidates:
+            if self.is_winning_move(coords[idx], self.player):
+                return coords[idx]
         
         # Quick block check - if opponent can win, block it
-        for move in legal_moves:
-            if self.is_winning_move(move, self.opponent):
-                return move
+        for idx in candidates:
+            if self.is_winning_move(coords[idx], self.opponent):
+                return coords[idx]
+        
+        candidates = self._unique_moves(candidates)
+        
+        if not self.use_alpha_beta:
+            _, best_idx = self._search_root(candidates, self.depth, -_INF, _INF)
+            return coords[best_idx]
+        
+        # Iterative deepening: each pass fills the transposition table
+        # with best moves that order the next, deeper pass, and the root
+        # searches its previous best move first. From depth 2 on, the
+        # window is narrowed around the previous score and only widened
+        # to the full range if the result falls outside it.
+        score = 0
+        for depth in range(1, self.depth + 1):
+            if depth == 1:
+                alpha, beta = -_INF, _INF
+            else:
+                alpha = score - self.ASPIRATION_WINDOW
+                beta = score + self.ASPIRATION_WINDOW
+            score, best_idx = self._search_root(candidates, depth, alpha, beta)
+            if score <= alpha or score >= beta:
+                score, best_idx = self._search_root(candidates, depth,
+                                                    -_INF, _INF)
+            
+            candidates.remove(best_idx)
+            candidates.insert(0, best_idx)
         
-        # Order moves by proximity to existing stones
-        ordered_moves = self.order_moves(legal_moves)
+        return coords[best_idx]
+    
+    def _unique_moves(self, candidates: List[int]) -> List[int]:
+        """
+        Drop root moves that are mirror images of an earlier candidate
         
-        best_score = float('-inf')
-        best_move = ordered_moves[0]  # Default to first move
-        alpha = float('-inf')
-        beta = float('inf')
+        When a rotation or reflection maps the position onto itself (the
+        empty-ish boards of the opening, typically), moves related by it
+        lead to equivalent positions and only one of each set needs
+        searching. Order among the kept moves is unchanged.
+        """
+        cells = self.cells
+        get = cells.__getitem__
+        symmetries = [perm for perm in self._geometry.symmetries
+                      if bytes(map(get, perm)) == cells]
+        if not symmetries:
+            return candidates
+        
+        unique = []
+        seen = set()
+        for idx in candidates:
+            if idx in seen:
+                continue
+            unique.append(idx)
+            seen.update(perm[idx] for perm in symmetries)
+        return unique
+    
+    def _search_root(self, candidates: List[int], depth: int,
+                     alpha: int, beta: int) -> Tuple[int, int]:
+        """
+        Search every root move to a fixed depth within a window
         
-        for move in ordered_moves:
-            row, col = move
+        Args:
+            candidates: Root moves as search board indices, best first
+            depth: Search depth
+            alpha: Lower bound of the window
+            beta: Upper bound of the window
             
+        Returns:
+            (best score, index of the best move)
+        """
+        best_score = -_INF
+        best_idx = candidates[0]  # Default to first move
+        
+        search = self.minimax
+        child_depth = depth - 1
+        code = CELL_CODES[self.player]
+        
+        for i, idx in enumerate(candidates):
             # Try this move
-            original_value = self.game.board[row][col]
-            self.game.board[row][col] = self.player
+            self._place(idx, code)
             
-            # Evaluate with minimax
-            if self.use_alpha_beta:
-                score = self.minimax(self.depth - 1, alpha, beta, False)
+            # Principal variation search: the first move gets the full
+            # window, the rest only need to prove they can't beat alpha
+            if i == 0 or not self.use_alpha_beta:
+                score = -search(child_depth, -beta, -alpha, False)
             else:
-                score = self.minimax(self.depth - 1, alpha, beta, False)
+                score = -search(child_depth, -alpha - 1, -alpha, False)
+                if alpha < score < beta:
+                    # Null window failed high - re-search for the exact score
+                    score = -search(child_depth, -beta, -alpha, False)
             
             # Undo move
-            self.game.board[row][col] = original_value
+            self._remove(idx)
             
             # Update best move
             if score > best_score:
                 best_score = score
-                best_move = move
+                best_idx = idx
             
             # Update alpha for pruning
-            alpha = max(alpha, best_score)
+            if self.use_alpha_beta:
+                if best_score > alpha:
+                    alpha = best_score
+                if alpha >= beta:
+                    break
         
-        return best_move
+        return best_score, best_idx
     
-    def minimax(self, depth: int, alpha: float, beta: float, maximizing: bool) -> float:
+    def minimax(self, depth: int, alpha: int, beta: int, maximizing: bool) -> int:
         """
-        Minimax algorithm with alpha-beta pruning
+        Minimax in negamax form with alpha-beta pruning
         
         Args:
             depth: Remaining search depth
             alpha: Alpha value for pruning
             beta: Beta value for pruning
-            maximizing: True if maximizing player's turn
+            maximizing: True if it is the AI's turn to move
             
         Returns:
-            Evaluation score
+            Evaluation score from the perspective of the side to move
         """
         self.nodes_evaluated += 1
+        sign = 1 if maximizing else -1
         
-        # Terminal conditions
-        if depth == 0:
-            return self.evaluate_board()
+        # Terminal conditions - a move that completed five ends the line
+        # of play, and is scored like a leaf
+        if depth == 0 or self._completed_five():
+            return sign * self.evaluate_board()
         
         # Check if game is over
         if self.is_game_over():
             winner = self.get_winner()
             if winner == self.player:
-                return self.FIVE
+                return sign * self.FIVE
             elif winner == self.opponent:
-                return -self.FIVE
+                return -sign * self.FIVE
             else:
                 return 0  # Draw
         
-        legal_moves = self.get_legal_moves_nearby()
-        if not legal_moves:
+        # Transposition table probe: reuse a result searched at least as
+        # deep, if its bound settles this window
+        zobrist_hash = self.zobrist_hash
+        slot = zobrist_hash & self._tt_mask
+        tt_move = 0
+        if self._tt_keys[slot] == zobrist_hash:
+            entry = self._tt_entries[slot]
+            if (entry >> 2) & 0xFF >= depth:
+                score = entry >> 22
+                flag = entry & 3
+                if (flag == TT_EXACT
+                        or (flag == TT_LOWER and score >= beta)
+                        or (flag == TT_UPPER and score <= alpha)):
+                    return score
+            tt_move = (entry >> 10) & 0xFFF
+        alpha_orig = alpha
+        
+        counts = self._nearby_counts()
+        if not counts:
             return 0  # Draw
         
-        # Order moves for better pruning
-        ordered_moves = self.order_moves(legal_moves)
-        
-        if maximizing:
-            max_eval = float('-inf')
-            for move in ordered_moves:
-                row, col = move
-                
-                # Make move
-                original_value = self.game.board[row][col]
-                self.game.board[row][col] = self.player
-                
-                # Recurse
-                eval_score = self.minimax(depth - 1, alpha, beta, False)
-                
-                # Undo move
-                self.game.board[row][col] = original_value
-                
-                max_eval = max(max_eval, eval_score)
-                
-                # Alpha-beta pruning
-                if self.use_alpha_beta:
-                    alpha = max(alpha, eval_score)
-                    if beta <= alpha:
-                        break  # Beta cutoff
-                
-            return max_eval
+        # Most promising moves first for better pruning. Killer moves of
+        # this ply go ahead of them, and the best move from an earlier
+        # visit of this position ahead of everything.
+        code = CELL_CODES[self.player if maximizing else self.opponent]
+        candidates = self._order_cells(counts, code)
+        ply = len(self._nearby_stack) - 1
+        killers = self.killers[ply]
+        for move in (killers[1], killers[0], tt_move):
+            if move and move in candidates:
+                candidates.remove(move)
+                candidates.insert(0, move)
+        best_eval = -_INF
+        best_idx = candidates[0]
+        
+        # Hoist attribute lookups out of the hot loop
+        place = self._place
+        remove = self._remove
+        search = self.minimax
+        use_alpha_beta = self.use_alpha_beta
+        child_depth = depth - 1
+        child_maximizing = not maximizing
+        can_reduce = use_alpha_beta and depth >= self.LMR_MIN_DEPTH
+        
+        for i, idx in enumerate(candidates):
+            # Make move
+            place(idx, code)
+            
+            # Recurse - the child's score is from the other side's view.
+            # Principal variation search: only the first move gets the
+            # full window; the rest get a null window that just proves
+            # they are no better than alpha, and are re-searched in full
+            # when that fails. Late moves make the null-window probe at
+            # reduced depth first.
+            if i == 0 or not use_alpha_beta:
+                eval_score = -search(child_depth, -beta, -alpha, child_maximizing)
+            else:
+                if can_reduce and i >= self.LMR_FULL_MOVES:
+                    eval_score = -search(child_depth - 1, -alpha - 1, -alpha,
+                                         child_maximizing)
+                else:
+                    eval_score = alpha + 1
+                if eval_score > alpha:
+                    eval_score = -search(child_depth, -alpha - 1, -alpha,
+                                         child_maximizing)
+                if alpha < eval_score < beta:
+                    eval_score = -search(child_depth, -beta, -alpha,
+                                         child_maximizing)
+            
+            # Undo move
+            remove(idx)
+            
+            if eval_score > best_eval:
+                best_eval = eval_score
+                best_idx = idx
+            
+            # Alpha-beta pruning
+            if use_alpha_beta:
+                if eval_score > alpha:
+                    alpha = eval_score
+                if beta <= alpha:
+                    # Cutoff - remember the move for siblings and later
+                    # searches
+                    self.history[idx] += depth * depth
+                    if killers[0] != idx:
+                        killers[1] = killers[0]
+                        killers[0] = idx
+                    break
+        
+        # Store the result; a deeper entry for the same position is kept
+        if best_eval <= alpha_orig:
+            flag = TT_UPPER
+        elif best_eval >= beta:
+            flag = TT_LOWER
         else:
-            min_eval = float('inf')
-            for move in ordered_moves:
-                row, col = move
-                
-                # Make move
-                original_value = self.game.board[row][col]
-                self.game.board[row][col] = self.opponent
-                
-                # Recurse
-                eval_score = self.minimax(depth - 1, alpha, beta, True)
-                
-                # Undo move
-                self.game.board[row][col] = original_value
-                
-                min_eval = min(min_eval, eval_score)
-                
-                # Alpha-beta pruning
-                if self.use_alpha_beta:
-                    beta = min(beta, eval_score)
-                    if beta <= alpha:
-                        break  # Alpha cutoff
-                
-            return min_eval
+            flag = TT_EXACT
+        entry = self._tt_entries[slot]
+        if self._tt_keys[slot] != zobrist_hash or (entry >> 2) & 0xFF <= depth:
+            self._tt_keys[slot] = zobrist_hash
+            self._tt_entries[slot] = ((best_eval << 22) | (best_idx << 10)
+                                      | (depth << 2) | flag)
+        
+        return best_eval
     
-    def hash_board(self) -> tuple:
+    def hash_board(self) -> bytes:
         """
         Create a hash of the current board state for caching
         
         Returns:
-            Hashable tuple representation of board
+            Immutable bytes snapshot of the search board
         """
-        return tuple(tuple(row) for row in self.game.board)
+        return bytes(self.cells)
     
-    def evaluate_board(self) -> float:
+    def evaluate_board(self) -> int:
         """
         Evaluate current board position using pattern-based heuristics
-        WITH CACHING for performance optimization
+        Reads the incrementally maintained pattern totals, so this is O(1)
         
         Returns:
             Score (positive = good for AI, negative = good for opponent)
         """
-        # Check cache first
-        board_hash = self.hash_board()
-        if board_hash in self.board_score_cache:
-            return self.board_score_cache[board_hash]
-        
-        # Calculate score using original logic
-        ai_score = self.count_patterns(self.player)
-        opp_score = self.count_patterns(self.opponent)
-        score = ai_score - opp_score
-        
-        # Store in cache
-        self.board_score_cache[board_hash] = score
-        return score
+        totals = self.pattern_totals
+        return (totals[CELL_CODES[self.player]]
+                - totals[CELL_CODES[self.opponent]])
     
-    def count_patterns(self, player: str) -> float:
+    def count_patterns(self, player: str) -> int:
         """
         Count and score all patterns for a specific player
         (Renamed from evaluate_player for clarity)
@@ -237,102 +737,112 @@ class MinimaxAI:
         Returns:
             Total score for this player's patterns
         """
+        code = CELL_CODES[player]
+        cells = self.cells
+        steps = self._steps
+        run_scores = self._run_scores
         score = 0
-        board = self.game.board
-        size = self.game.board_size
-        
-        # Check all directions: horizontal, vertical, diagonal \, diagonal /
-        directions = [
-            (0, 1),   # Horizontal
-            (1, 0),   # Vertical
-            (1, 1),   # Diagonal \
-            (1, -1)   # Diagonal /
-        ]
         
-        checked = set()  # Avoid double counting
-        
-        for row in range(size):
-            for col in range(size):
-                if board[row][col] != player:
+        idx = cells.find(code)
+        while idx != -1:
+            for step in steps:
+                # Only score a run from its first stone, so each run is
+                # counted once. A border or opponent stone blocks an end.
+                before = cells[idx - step]
+                if before == code:
                     continue
                 
-                for dr, dc in directions:
-                    # Create unique key for this line
-                    key = (row, col, dr, dc)
-                    if key in checked:
-                        continue
-                    
-                    # Count consecutive stones in this direction
-                    length = 0
-                    r, c = row, col
-                    
-                    while (0 <= r < size and 0 <= c < size and 
-                           board[r][c] == player):
-                        length += 1
-                        checked.add((r, c, dr, dc))
-                        r += dr
-                        c += dc
-                    
-                    # Check if line is blocked on ends
-                    # Check start (out of bounds = blocked, or opponent stone = blocked)
-                    start_r = row - dr
-                    start_c = col - dc
-                    if not (0 <= start_r < size and 0 <= start_c < size):
-                        start_blocked = True  # Edge of board blocks
-                    else:
-                        start_blocked = (board[start_r][start_c] != ' ')
-                    
-                    # Check end (out of bounds = blocked, or opponent stone = blocked)
-                    end_r = row + dr * length
-                    end_c = col + dc * length
-                    if not (0 <= end_r < size and 0 <= end_c < size):
-                        end_blocked = True  # Edge of board blocks
-                    else:
-                        end_blocked = (board[end_r][end_c] != ' ')
-                    
-                    # Score based on pattern
-                    if length >= 5:
-                        score += self.FIVE
-                    elif length == 4:
-                        if not start_blocked and not end_blocked:
-                            score += self.OPEN_FOUR
-                        else:
-                            score += self.BLOCKED_FOUR
-                    elif length == 3:
-                        if not start_blocked and not end_blocked:
-                            score += self.OPEN_THREE
-                        else:
-                            score += self.BLOCKED_THREE
-                    elif length == 2:
-                        if not start_blocked and not end_blocked:
-                            score += self.OPEN_TWO
-                        else:
-                            score += self.BLOCKED_TWO
+                # Count consecutive stones (capped at five)
+                length = 1
+                nxt = idx + step
+                while length < 5 and cells[nxt] == code:
+                    length += 1
+                    nxt += step
+                
+                if length >= 2:
+                    both_open = before == EMPTY and cells[nxt] == EMPTY
+                    score += run_scores[length][both_open]
+            
+            idx = cells.find(code, idx + 1)
         
         return score
     
-    def get_legal_moves_nearby(self, radius=2):
-        moves = set()
-        board = self.game.board
-        size = self.game.board_size
+    def get_legal_moves_nearby(self, radius=NEARBY_RADIUS) -> List[Tuple[int, int]]:
+        """
+        Get empty cells within radius of existing stones, best first
+        
+        Each candidate is scored by how many stones lie in its
+        neighborhood, so the list comes back already ordered for
+        alpha-beta without a separate proximity pass.
+        
+        Args:
+            radius: Neighborhood radius around each stone
+            
+        Returns:
+            List of (row, col) tuples, most crowded neighborhoods first
+        """
+        coords = self._cell_coords
+        counts = self._nearby_counts(radius)
+        return [coords[idx] for idx in sorted(counts, key=counts.get, reverse=True)]
+    
+    def _nearby_counts(self, radius=NEARBY_RADIUS) -> dict:
+        """
+        Candidate cells near stones, as a dict of search board index ->
+        stones within radius
+        """
+        cells = self.cells
+        if radius != self.NEARBY_RADIUS:
+            counts = self._count_nearby(radius)
+        else:
+            # A child position differs from its parent by one stone, so
+            # its counts are the parent's plus that stone's neighborhood
+            stack = self._nearby_stack
+            entry = stack[-1]
+            counts = entry[1]
+            if counts is None:
+                parent = stack[-2][1] if len(stack) > 1 else None
+                if parent is None:
+                    counts = self._count_nearby(radius)
+                else:
+                    move = entry[0]
+                    counts = parent.copy()
+                    counts.pop(move, None)
+                    for offset in self._nearby_offsets:
+                        neighbor = move + offset
+                        if cells[neighbor] == EMPTY:
+                            counts[neighbor] = counts.get(neighbor, 0) + 1
+                entry[1] = counts
         
         # If board empty, return center
-        if all(board[r][c] == ' ' for r in range(size) for c in range(size)):
-            return [(size // 2, size // 2)]
+        if not counts and not self.stone_count:
+            size = self.game.board_size
+            return {self._index(size // 2, size // 2): 0}
         
-        # Find all occupied positions
-        for row in range(size):
-            for col in range(size):
-                if board[row][col] != ' ':
-                    # Add all empty cells within radius
-                    for dr in range(-radius, radius + 1):
-                        for dc in range(-radius, radius + 1):
-                            r, c = row + dr, col + dc
-                            if (0 <= r < size and 0 <= c < size and 
-                                board[r][c] == ' '):
-                                moves.add((r, c))
+        return counts
+    
+    def _count_nearby(self, radius: int) -> dict:
+        """
+        Count the stones within radius of every empty cell, from scratch
         
-        return list(moves)
+        Returns:
+            Dict of search board index -> stone count, for every empty
+            cell with at least one stone nearby
+        """
+        cells = self.cells
+        offsets = self._geometry.neighborhood(radius)
+        counts = {}
+        
+        for code in (STONE_X, STONE_O):
+            idx = cells.find(code)
+            while idx != -1:
+                # Count this stone for every empty cell within radius
+                for offset in offsets:
+                    neighbor = idx + offset
+                    if cells[neighbor] == EMPTY:
+                        counts[neighbor] = counts.get(neighbor, 0) + 1
+                idx = cells.find(code, idx + 1)
+        
+        return counts
     
     def get_legal_moves(self) -> List[Tuple[int, int]]:
         """
@@ -353,8 +863,8 @@ class MinimaxAI:
     
     def order_moves(self, moves: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """
-        Order moves by proximity to existing stones
-        Moves near existing stones are more likely to be good
+        Order moves by the patterns they would extend or break
+        Moves on strong lines are more likely to be good
         
         Args:
             moves: List of (row, col) moves
@@ -362,41 +872,58 @@ class MinimaxAI:
         Returns:
             Ordered list of moves
         """
-        if not moves:
-            return moves
-        
-        # If board is empty, return center
-        if all(self.game.board[r][c] == ' ' 
-               for r in range(self.game.board_size) 
-               for c in range(self.game.board_size)):
-            center = self.game.board_size // 2
-            return [(center, center)]
-        
-        # Score each move by proximity to existing stones
-        scored_moves = []
-        
-        for move in moves:
-            row, col = move
-            min_distance = float('inf')
-            
-            # Find distance to nearest stone
-            for r in range(self.game.board_size):
-                for c in range(self.game.board_size):
-                    if self.game.board[r][c] != ' ':
-                        distance = abs(row - r) + abs(col - c)
-                        min_distance = min(min_distance, distance)
-            
-            scored_moves.append((min_distance, move))
+        index = self._index
+        coords = self._cell_coords
+        ordered = self._order_cells(
+            dict.fromkeys([index(row, col) for row, col in moves], 0),
+            CELL_CODES[self.player])
+        return [coords[idx] for idx in ordered]
+    
+    def _order_cells(self, counts: dict, code: int) -> List[int]:
+        """
+        Order candidate cells for the side playing code, best first
         
-        # Sort by distance (closer is better)
-        scored_moves.sort(key=lambda x: x[0])
+        A cell's promise is read straight off the current line scores:
+        the four lines through it, weighting the mover's own patterns
+        (attack) slightly above the opponent's (defense). Nothing is
+        placed or rescored. Ties go to the cell with the better cutoff
+        history, then to the more crowded neighborhood - all in a single
+        sort over both players' scores.
         
-        return [move for _, move in scored_moves]
+        Args:
+            counts: Candidate index -> stones in its neighborhood
+            code: Cell code of the side to move
+        """
+        if code == STONE_X:
+            own, other = self.line_scores_x, self.line_scores_o
+        else:
+            own, other = self.line_scores_o, self.line_scores_x
+        cell_line_ids = self._cell_line_ids
+        history = self.history
+        
+        # Weigh every line once, then each cell is a sum of four reads.
+        # Sort keys are plain tuples ending in the negated arrival order,
+        # so the C tuple compare does the whole sort (no key function)
+        # and ties still keep their order.
+        line_values = [10 * mine + 9 * theirs for mine, theirs in zip(own, other)]
+        scored = []
+        append = scored.append
+        for order, (idx, count) in enumerate(counts.items()):
+            a, b, c, d = cell_line_ids[idx]
+            append((line_values[a] + line_values[b] + line_values[c]
+                    + line_values[d], history[idx], count, -order, idx))
+        scored.sort(reverse=True)
+        
+        return [item[4] for item in scored]
     
     def is_winning_move(self, move: Tuple[int, int], player: str) -> bool:
         """
         Check if a move results in immediate win
         
+        Looks up the four lines through the move with the stone added in
+        the line table, so nothing is placed. Reads the search board, so
+        it reflects the game board as of the last initialize_ai_state.
+        
         Args:
             move: (row, col) position
             player: Player symbol
@@ -404,23 +931,49 @@ class MinimaxAI:
         Returns:
             True if move wins the game
         """
-        row, col = move
-        
-        # Temporarily make the move
-        original = self.game.board[row][col]
-        self.game.board[row][col] = player
-        
-        # Check if it's a winning position
-        is_win = self.game.check_winner(row, col, player)
-        
-        # Undo move
-        self.game.board[row][col] = original
-        
-        return is_win
+        idx = self._index(*move)
+        code = CELL_CODES[player]
+        current = self.line_scores_x if code == STONE_X else self.line_scores_o
+        keys = self.line_keys
+        table = self._line_table
+        for lid, weight in self._cell_lines[idx]:
+            scores = table.get(keys[lid] + code * weight)
+            if scores is None:
+                scores = self._score_with(idx, code, lid, weight)
+            # All the other runs a line can hold together score far below
+            # FIVE, so score // FIVE counts the fives on the line
+            if scores[code - 1] // self.FIVE > current[lid] // self.FIVE:
+                return True
+        return False
+    
+    def _score_with(self, idx: int, code: int, lid: int,
+                    weight: int) -> Tuple[int, int]:
+        """Score (and table) a line as if code were placed at idx"""
+        cells = self.cells
+        original = cells[idx]
+        cells[idx] = code
+        scores = self._score_line(cells[self._line_slices[lid]])
+        cells[idx] = original
+        self._line_table[self.line_keys[lid] + code * weight] = scores
+        return scores
+    
+    def _completed_five(self) -> bool:
+        """Check whether the last search move made five in a row"""
+        idx = self._nearby_stack[-1][0]
+        if idx is None:
+            return False
+        if self.cells[idx] == STONE_X:
+            scores = self.line_scores_x
+        else:
+            scores = self.line_scores_o
+        for lid in self._cell_line_ids[idx]:
+            if scores[lid] >= self.FIVE:
+                return True
+        return False
     
     def is_game_over(self) -> bool:
         """Check if game is over"""
-        return self.game.game_over or not self.get_legal_moves()
+        return self.game.game_over or self.stone_count == self._board_cells
     
     def get_winner(self) -> Optional[str]:
         """Get winner if game is over"""
@@ -8,11 +8,84 @@ Week 1 Optimizations:
 - Opening Book
 """
 
-import copy
 import time
 import random
+from concurrent.futures import ProcessPoolExecutor
 from typing import Tuple, List, Optional, Dict
-from collections import defaultdict
+
+from src.game import GomokuGame
+
+# Integer search bound; keeps alpha/beta comparisons int-vs-int
+_INF = 10**9
+
+
+def _popcount(bits):
+    """Number of set bits (int.bit_count needs Python 3.10)"""
+    return bin(bits).count('1')
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+
+# The search polls the clock once every this many nodes (a power of two)
+_TIME_CHECK_INTERVAL = 1024
+
+
+# Pattern made by a run through a move: _RUN_PATTERNS[min(length, 4)][open]
+# where open is 1 when neither end is blocked
+_RUN_PATTERNS = (
+    (None, None),
+    (None, None),
+    (None, None),
+    ('BLOCKED_THREE', 'OPEN_THREE'),
+    ('BLOCKED_FOUR', 'OPEN_FOUR'),
+)
+
+# Index of each player's key list in TranspositionTable.zobrist
+PIECE_IDX = {'X': 0, 'O': 1}
+
+
+class TimeUp(Exception):
+    """Raised inside the search once the move deadline has passed"""
+
+
+def _compile_run_scorer(steps, run_scores, five):
+    """
+    Generate a run scorer specialized for one board geometry
+    
+    Emits straight-line source for the bitboard run scan with the four
+    direction strides, every shift amount and the pattern weights folded
+    in as constants, then compiles it once. The returned function takes
+    (stones, empty) bitboards and returns the same score as scanning
+    each run's length and open ends.
+    """
+    lines = ['def score_runs(stones, empty):', '    score = 0']
+    for step in steps:
+        lines += [
+            f'    runs = stones & ~(stones << {step})',
+            f'    runs2 = runs & (stones >> {step})',
+            '    if runs2:',
+            f'        open_start = runs & (empty << {step})',
+        ]
+        indent = '        '
+        for length in (2, 3, 4):
+            blocked, open_ = run_scores[length]
+            shift = length * step
+            lines += [
+                f'{indent}runs{length + 1} = runs{length} & (stones >> {shift})',
+                f'{indent}ended = runs{length} ^ runs{length + 1}',
+                f'{indent}if ended:',
+                f'{indent}    score += (popcount(ended) * {blocked} + popcount('
+                f'ended & open_start & (empty >> {shift})) * {open_ - blocked})',
+                f'{indent}if runs{length + 1}:',
+            ]
+            indent += '    '
+        lines.append(f'{indent}score += popcount(runs5) * {five}')
+    lines.append('    return score')
+    
+    namespace = {'popcount': _popcount}
+    exec(compile('\n'.join(lines), '<run scorer>', 'exec'), namespace)
+    return namespace['score_runs']
 
 
 class OpeningBook:
@@ -111,24 +184,41 @@ class TranspositionTable:
     """
     Transposition table with Zobrist hashing
     Stores previously evaluated positions
+    
+    Fixed size, open addressed: a hash maps to a bucket of two adjacent
+    slots. The first keeps the deepest entry (depth-preferred), the
+    second takes whatever the first turned away (always-replace).
     """
     
+    BITS = 20  # 2**20 slots
+    
     def __init__(self, size=15):
-        self.table = {}
+        slots = 1 << self.BITS
+        self.keys = [-1] * slots  # Zobrist hashes are never negative
+        self.entries = [None] * slots  # (depth, score, flag, best_move)
+        self.bucket_mask = (slots - 1) & ~1
         self.size = size
         self.current_hash = 0
         
-        # Initialize Zobrist hash values with better randomness
+        # Initialize Zobrist hash values with better randomness. A private,
+        # fixed-seed generator keeps the keys reproducible without
+        # reseeding the global random module (the opening book uses it).
         import hashlib
         seed = int(hashlib.md5(b"gomoku_zobrist_2025").hexdigest()[:16], 16)
-        random.seed(seed)
-        self.zobrist = {}
-        
-        # Generate random values for each position and player
-        for row in range(size):
-            for col in range(size):
-                self.zobrist[(row, col, 'X')] = random.getrandbits(64)
-                self.zobrist[(row, col, 'O')] = random.getrandbits(64)
+        rng = random.Random(seed)
+        
+        # Generate random values for each position and player: one flat
+        # list per player (see PIECE_IDX), indexed by row * size + col
+        zob_x = []
+        zob_o = []
+        for _ in range(size * size):
+            zob_x.append(rng.getrandbits(64))
+            zob_o.append(rng.getrandbits(64))
+        self.zobrist = (zob_x, zob_o)
+        
+        # XORed in after a null move, when the side to move no longer
+        # follows from the stones on the board
+        self.side_key = rng.getrandbits(64)
     
     def hash_board(self, board):
         """
@@ -136,11 +226,13 @@ class TranspositionTable:
         Much faster than tuple hashing
         """
         h = 0
+        zobrist = self.zobrist
+        index = 0
         for row in range(self.size):
-            for col in range(self.size):
-                piece = board[row][col]
+            for piece in board[row]:
                 if piece != ' ':
-                    h ^= self.zobrist[(row, col, piece)]
+                    h ^= zobrist[PIECE_IDX[piece]][index]
+                index += 1
         return h
     
     def update_hash(self, current_hash, row, col, piece):
@@ -148,7 +240,7 @@ class TranspositionTable:
         Incrementally update hash when placing a piece
         Much faster than rehashing entire board
         """
-        return current_hash ^ self.zobrist[(row, col, piece)]
+        return current_hash ^ self.zobrist[PIECE_IDX[piece]][row * self.size + col]
     
     def store(self, board, depth, score, flag, best_move=None):
         """
@@ -161,13 +253,21 @@ class TranspositionTable:
             flag: 'exact', 'lower', or 'upper'
             best_move: Best move found (optional)
         """
-        key = self.hash_board(board)
-        self.table[key] = {
-            'depth': depth,
-            'score': score,
-            'flag': flag,
-            'best_move': best_move
-        }
+        self.store_by_key(self.hash_board(board), depth, score, flag, best_move)
+    
+    def store_by_key(self, key, depth, score, flag, best_move=None):
+        """
+        Store position evaluation under an already computed hash
+        
+        Lets the search keep the hash up to date with update_hash
+        instead of rehashing the whole board at every node.
+        """
+        slot = key & self.bucket_mask
+        entry = self.entries[slot]
+        if not (entry is None or self.keys[slot] == key or depth >= entry[0]):
+            slot += 1  # Keep the deeper entry, use the always-replace slot
+        self.keys[slot] = key
+        self.entries[slot] = (depth, score, flag, best_move)
     
     def lookup(self, board, depth, alpha, beta):
         """
@@ -176,40 +276,50 @@ class TranspositionTable:
         Returns:
             (score, move) if usable hit, else (None, None)
         """
-        key = self.hash_board(board)
-        
-        if key not in self.table:
-            return None, None
+        return self.lookup_by_key(self.hash_board(board), depth, alpha, beta)
+    
+    def lookup_by_key(self, key, depth, alpha, beta):
+        """
+        Lookup position in table by an already computed hash
         
-        entry = self.table[key]
+        Returns:
+            (score, move) if usable hit, else (None, None)
+        """
+        slot = key & self.bucket_mask
+        keys = self.keys
+        if keys[slot] != key:
+            slot += 1
+            if keys[slot] != key:
+                return None, None
+        entry_depth, score, flag, best_move = self.entries[slot]
         
         # Only use if depth is sufficient
-        if entry['depth'] < depth:
-            return None, entry.get('best_move')
-        
-        score = entry['score']
-        flag = entry['flag']
+        if entry_depth < depth:
+            return None, best_move
         
         # Check if score is usable
         if flag == 'exact':
-            return score, entry.get('best_move')
+            return score, best_move
         elif flag == 'lower':
             if score >= beta:
-                return score, entry.get('best_move')
+                return score, best_move
         elif flag == 'upper':
             if score <= alpha:
-                return score, entry.get('best_move')
+                return score, best_move
         
-        return None, entry.get('best_move')
+        return None, best_move
     
     def clear(self):
         """Clear the table"""
-        self.table.clear()
+        slots = len(self.keys)
+        self.keys[:] = [-1] * slots
+        self.entries[:] = [None] * slots
     
     def size_mb(self):
         """Get table size in MB"""
         import sys
-        return sys.getsizeof(self.table) / (1024 * 1024)
+        return (sys.getsizeof(self.keys)
+                + sys.getsizeof(self.entries)) / (1024 * 1024)
 
 
 class MinimaxAI:
@@ -231,8 +341,15 @@ class MinimaxAI:
     OPEN_TWO = 10       # Two in a row with both ends open
     BLOCKED_TWO = 1     # Two in a row with one end blocked
     
+    # Search tuning
+    ASPIRATION_WINDOW = 1000  # Half-width of the window around the last score
+    NULL_MOVE_REDUCTION = 2   # R: null-move searches go 1 + R plies shallower
+    NULL_MOVE_MIN_DEPTH = 3   # Only try a null move with this much depth left
+    QUIESCENCE_DEPTH = 4      # Most forcing plies searched past the horizon
+    
     def __init__(self, game, player='O', depth=3, time_limit=5.0, 
-                 use_opening_book=True, use_iterative_deepening=True):
+                 use_opening_book=True, use_iterative_deepening=True,
+                 workers=0):
         """
         Initialize Optimized Minimax AI
         
@@ -243,24 +360,62 @@ class MinimaxAI:
             time_limit: Time limit for move search (seconds)
             use_opening_book: Enable opening book
             use_iterative_deepening: Enable iterative deepening
+            workers: Processes for searching root moves in parallel
+                     (0 or 1 searches serially)
         """
         self.game = game
         self.player = player
         self.opponent = 'X' if player == 'O' else 'O'
         self.max_depth = depth
         self.time_limit = time_limit
+        self.deadline = float('inf')  # time.monotonic() value; set per move
+        self.last_score = None  # Root score of the last completed search
         self.use_opening_book = use_opening_book
         self.use_iterative_deepening = use_iterative_deepening
+        self.workers = workers
+        self._executor = None  # Started on the first parallel search
         
         # Performance tracking
         self.nodes_evaluated = 0
         self.transposition_hits = 0
         self.transposition_cutoffs = 0
         
+        # (blocked, open) score of a run by length
+        self._run_scores = (
+            (0, 0),
+            (0, 0),
+            (self.BLOCKED_TWO, self.OPEN_TWO),
+            (self.BLOCKED_THREE, self.OPEN_THREE),
+            (self.BLOCKED_FOUR, self.OPEN_FOUR),
+        )
+        
+        self._scorer = None
+        self._scorer_steps = None
+        
+        # Leaf scores by Zobrist hash, reset for every move
+        self._eval_cache = {}
+        
+        # Move ordering heuristics, reset for every move: two killer moves
+        # (recent cutoffs) per remaining depth, and a history score per cell
+        self.killers = []
+        self.history = []
+        self.reset_heuristics()
+        
         # Components
         self.transposition_table = TranspositionTable(game.board_size)
         self.opening_book = OpeningBook() if use_opening_book else None
         
+    def close(self):
+        """Shut down the worker processes of parallel root search, if started"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __del__(self):
+        # Backstop for callers that drop the AI without closing it
+        if getattr(self, '_executor', None) is not None:
+            self.close()
+    
     def make_move(self) -> Optional[Tuple[int, int]]:
         """
         Find and return the best move
@@ -268,7 +423,8 @@ class MinimaxAI:
         Returns:
             (row, col) tuple or None if no valid moves
         """
-        start_time = time.time()
+        start_time = time.monotonic()
+        self.deadline = start_time + self.time_limit
         
         # Try opening book first
         if self.use_opening_book and self.opening_book:
@@ -280,6 +436,8 @@ class MinimaxAI:
                 return opening_move
         
         # Reset counters
+        self._eval_cache.clear()
+        self.reset_heuristics()
         self.nodes_evaluated = 0
         self.transposition_hits = 0
         self.transposition_cutoffs = 0
@@ -290,7 +448,7 @@ class MinimaxAI:
         else:
             best_move = self.get_best_move()
         
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         
         # Statistics
         print(f"[AI] ⚡ Search completed in {elapsed:.2f}s")
@@ -307,30 +465,45 @@ class MinimaxAI:
         Searches depth 1, 2, 3, ... until time runs out
         TT is preserved between depths for better performance
         
+        From depth 2 on, each depth is first searched with an aspiration
+        window around the previous depth's score, and searched again with
+        a full window only if the result falls outside it.
+        
         Returns:
             Best move found
         """
         best_move = None
         depth = 1
+        self.last_score = None
         
         # Don't clear TT - reuse info from previous depths!
         print(f"[AI] 🔄 Starting iterative deepening (max depth={self.max_depth})")
         
         while depth <= self.max_depth:
-            if time.time() - start_time >= self.time_limit:
+            if time.monotonic() >= self.deadline:
                 print(f"[AI] ⏱️ Time limit reached at depth {depth}")
                 break
             
             print(f"[AI] 🔍 Searching depth {depth}...")
             
-            current_move = self.get_best_move_at_depth(depth, start_time)
+            prev_score = self.last_score
+            if prev_score is None:
+                current_move = self.get_best_move_at_depth(depth)
+            else:
+                alpha = prev_score - self.ASPIRATION_WINDOW
+                beta = prev_score + self.ASPIRATION_WINDOW
+                current_move = self.get_best_move_at_depth(depth, alpha, beta)
+                
+                # Failed high or low: the true score is outside the window
+                if self.last_score is not None and not alpha < self.last_score < beta:
+                    current_move = self.get_best_move_at_depth(depth)
             
             if current_move:
                 best_move = current_move
                 print(f"[AI] ✅ Depth {depth} complete: {best_move}")
             
             # Check if we should continue
-            if time.time() - start_time >= self.time_limit * 0.8:
+            if time.monotonic() - start_time >= self.time_limit * 0.8:
                 print(f"[AI] ⏱️ 80% time used, stopping at depth {depth}")
                 break
             
@@ -338,53 +511,79 @@ class MinimaxAI:
         
         return best_move if best_move else self.get_fallback_move()
     
-    def get_best_move_at_depth(self, depth, start_time):
+    def get_best_move_at_depth(self, depth, alpha=-_INF, beta=_INF):
         """
         Find best move at specific depth
+        
+        Searches within the window (alpha, beta) and leaves the root
+        score in self.last_score (None when no search was needed, or it
+        was cut short). If the deadline passes mid-search, returns the
+        best move among the root moves searched so far.
         """
+        self.last_score = None
         legal_moves = self.get_threat_space_moves()
         
         if not legal_moves:
             return None
         
-        # Quick win/block check
-        for move in legal_moves:
-            if self.is_winning_move(move, self.player):
-                return move
-        
-        for move in legal_moves:
-            if self.is_winning_move(move, self.opponent):
-                return move
+        # Quick win/block check, one pass over both sides' five completions
+        game = self.game
+        wins = game.five_completions(self.player)
+        blocks = game.five_completions(self.opponent)
+        if wins or blocks:
+            block = None
+            for move in legal_moves:
+                bit = 1 << (move[0] * game.stride + move[1])
+                if wins & bit:
+                    return move
+                if block is None and blocks & bit:
+                    block = move
+            if block is not None:
+                return block
+        
+        # Hash the root once; the search updates it incrementally
+        tt = self.transposition_table
+        root_hash = tt.hash_board(self.game.board)
+        keys = tt.zobrist[PIECE_IDX[self.player]]
+        size = tt.size
         
         # Check TT for best move hint from previous depth
-        _, tt_best_move = self.transposition_table.lookup(
-            self.game.board, depth, float('-inf'), float('inf')
-        )
+        _, tt_best_move = tt.lookup_by_key(root_hash, depth, -_INF, _INF)
         
         # Order moves intelligently (TT best move gets highest priority)
         ordered_moves = self.advanced_move_ordering(legal_moves, tt_best_move)
         
-        best_score = float('-inf')
+        best_score = -_INF
         best_move = ordered_moves[0]
-        alpha = float('-inf')
-        beta = float('inf')
-        
-        for move in ordered_moves:
-            # Time check
-            if time.time() - start_time >= self.time_limit:
+        window_alpha = alpha
+        
+        for index, move in enumerate(ordered_moves):
+            if index == 1 and self.workers > 1:
+                # Young Brothers Wait: the first move has set alpha, so
+                # its younger brothers can be searched side by side
+                for move, score in self._search_root_parallel(
+                        ordered_moves[1:], depth, alpha, beta):
+                    if score is None:  # Deadline passed
+                        return best_move
+                    if score > best_score:
+                        best_score = score
+                        best_move = move
                 break
             
             row, col = move
             
             # Make move
-            original = self.game.board[row][col]
-            self.game.board[row][col] = self.player
+            self.game.place(row, col, self.player)
             
             # Evaluate
-            score = self.minimax(depth - 1, alpha, beta, False, start_time)
-            
-            # Undo move
-            self.game.board[row][col] = original
+            try:
+                score = self.minimax(depth - 1, alpha, beta, False,
+                                     root_hash ^ keys[row * size + col])
+            except TimeUp:
+                return best_move
+            finally:
+                # Undo move
+                self.game.unplace(row, col)
             
             # Update best
             if score > best_score:
@@ -392,51 +591,110 @@ class MinimaxAI:
                 best_move = move
             
             alpha = max(alpha, best_score)
+            if alpha >= beta:
+                break  # Fail high; the caller re-searches
         
-        # Store in transposition table
-        self.transposition_table.store(
-            self.game.board, depth, best_score, 'exact', best_move
-        )
+        # Store in transposition table (only scores inside the window are exact)
+        self.last_score = best_score
+        if window_alpha < best_score < beta:
+            tt.store_by_key(root_hash, depth, best_score, 'exact', best_move)
         
         return best_move
     
+    def _search_root_parallel(self, moves, depth, alpha, beta):
+        """
+        Search root moves in worker processes, all with the same window
+        
+        Workers keep their own transposition tables, so only the window
+        is shared. Returns (move, score) pairs in order; the score is None
+        for a move its worker could not finish before the deadline.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        
+        futures = [self._executor.submit(_search_root_move, self.game.board,
+                                         self.player, depth, move, alpha, beta,
+                                         self.deadline)
+                   for move in moves]
+        
+        results = []
+        for move, future in zip(moves, futures):
+            score, nodes = future.result()
+            self.nodes_evaluated += nodes
+            results.append((move, score))
+        return results
+    
     def get_best_move(self):
         """
         Legacy method for fixed depth search
         """
-        return self.get_best_move_at_depth(self.max_depth, time.time())
+        self.deadline = time.monotonic() + self.time_limit
+        return self.get_best_move_at_depth(self.max_depth)
     
-    def minimax(self, depth, alpha, beta, maximizing, start_time):
+    def minimax(self, depth, alpha, beta, maximizing, h=None, allow_null=True):
         """
         Minimax with alpha-beta pruning and transposition table
+        
+        h is the Zobrist hash of the current board. Callers pass it down
+        updated for each move, so nodes never rehash the board; it is
+        only computed from scratch when omitted.
+        
+        allow_null is False right after a null move, so a side never
+        passes twice in a row.
+        
+        Raises TimeUp once self.deadline has passed; moves are undone on
+        the way out, so the board is left as it was found.
         """
         self.nodes_evaluated += 1
         
         # Time check
-        if time.time() - start_time >= self.time_limit:
-            return self.evaluate_board()
+        if (not self.nodes_evaluated % _TIME_CHECK_INTERVAL
+                and time.monotonic() >= self.deadline):
+            raise TimeUp
+        
+        tt = self.transposition_table
+        if h is None:
+            h = tt.hash_board(self.game.board)
         
         # Check transposition table
-        tt_score, tt_move = self.transposition_table.lookup(
-            self.game.board, depth, alpha, beta
-        )
+        tt_score, tt_move = tt.lookup_by_key(h, depth, alpha, beta)
         
         if tt_score is not None:
             self.transposition_hits += 1
             self.transposition_cutoffs += 1
             return tt_score
         
-        # Terminal conditions
+        # The window this node was asked about; the search below narrows
+        # alpha/beta, so the TT bound flag must be judged against these
+        alpha_orig = alpha
+        beta_orig = beta
+        
+        # Terminal conditions (quiescence checks for a five itself)
         if depth == 0:
-            return self.evaluate_board()
+            return self.quiescence(alpha, beta, maximizing, h, self.QUIESCENCE_DEPTH)
         
-        if self.is_game_over():
-            winner = self.get_winner()
-            if winner == self.player:
-                return self.FIVE + depth  # Prefer faster wins
-            elif winner == self.opponent:
+        # Trial moves go through place, which records no winner, so test
+        # whether the side that just moved has made five
+        if maximizing:
+            if self.game.has_five(self.opponent):
                 return -self.FIVE - depth
-            return 0
+        elif self.game.has_five(self.player):
+            return self.FIVE + depth  # Prefer faster wins
+        
+        # Null move: let the other side move twice. If a reduced search
+        # still cannot get past the bound, a real move would not either.
+        if (allow_null and depth >= self.NULL_MOVE_MIN_DEPTH
+                and not self.facing_threat(maximizing)):
+            null_depth = depth - 1 - self.NULL_MOVE_REDUCTION
+            null_hash = h ^ tt.side_key
+            if maximizing:
+                score = self.minimax(null_depth, beta - 1, beta, False, null_hash, False)
+                if score >= beta:
+                    return beta
+            else:
+                score = self.minimax(null_depth, alpha, alpha + 1, True, null_hash, False)
+                if score <= alpha:
+                    return alpha
         
         # Get moves in threat space
         legal_moves = self.get_threat_space_moves()
@@ -444,23 +702,26 @@ class MinimaxAI:
             return 0
         
         # Order moves with TT hint
-        legal_moves = self.advanced_move_ordering(legal_moves, tt_move)
+        legal_moves = self.advanced_move_ordering(legal_moves, tt_move, depth)
         
         best_move = None
         
+        # Zobrist keys of the side to move, for the children's hashes
+        keys = tt.zobrist[PIECE_IDX[self.player if maximizing else self.opponent]]
+        size = tt.size
+        
         if maximizing:
-            max_eval = float('-inf')
-            flag = 'upper'
+            max_eval = -_INF
             
             for move in legal_moves:
                 row, col = move
                 
-                original = self.game.board[row][col]
-                self.game.board[row][col] = self.player
-                
-                eval_score = self.minimax(depth - 1, alpha, beta, False, start_time)
-                
-                self.game.board[row][col] = original
+                self.game.place(row, col, self.player)
+                try:
+                    eval_score = self.minimax(depth - 1, alpha, beta, False,
+                                              h ^ keys[row * size + col])
+                finally:
+                    self.game.unplace(row, col)
                 
                 if eval_score > max_eval:
                     max_eval = eval_score
@@ -469,31 +730,28 @@ class MinimaxAI:
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha:
-                    flag = 'lower'
+                    self.record_cutoff(move, depth)
                     break
             
             # Store in TT
-            if max_eval > float('-inf'):
-                if flag == 'lower' or (beta > alpha):
-                    flag = 'exact' if max_eval <= beta else flag
-                self.transposition_table.store(
-                    self.game.board, depth, max_eval, flag, best_move
-                )
+            if max_eval > -_INF:
+                tt.store_by_key(h, depth, max_eval,
+                                self._bound_flag(max_eval, alpha_orig, beta_orig),
+                                best_move)
             
             return max_eval
         else:
-            min_eval = float('inf')
-            flag = 'lower'
+            min_eval = _INF
             
             for move in legal_moves:
                 row, col = move
                 
-                original = self.game.board[row][col]
-                self.game.board[row][col] = self.opponent
-                
-                eval_score = self.minimax(depth - 1, alpha, beta, True, start_time)
-                
-                self.game.board[row][col] = original
+                self.game.place(row, col, self.opponent)
+                try:
+                    eval_score = self.minimax(depth - 1, alpha, beta, True,
+                                              h ^ keys[row * size + col])
+                finally:
+                    self.game.unplace(row, col)
                 
                 if eval_score < min_eval:
                     min_eval = eval_score
@@ -502,145 +760,251 @@ class MinimaxAI:
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha:
-                    flag = 'upper'
+                    self.record_cutoff(move, depth)
                     break
             
             # Store in TT
-            if min_eval < float('inf'):
-                if flag == 'upper' or (beta > alpha):
-                    flag = 'exact' if min_eval >= alpha else flag
-                self.transposition_table.store(
-                    self.game.board, depth, min_eval, flag, best_move
-                )
+            if min_eval < _INF:
+                tt.store_by_key(h, depth, min_eval,
+                                self._bound_flag(min_eval, alpha_orig, beta_orig),
+                                best_move)
             
             return min_eval
     
-    def evaluate_board(self):
+    @staticmethod
+    def _bound_flag(score, alpha, beta):
+        """
+        TT flag for a node score searched with the window (alpha, beta)
+        
+        At or below alpha the true value is at most score ('upper'); at
+        or above beta it is at least score ('lower'); only in between is
+        it exact.
+        """
+        if score <= alpha:
+            return 'upper'
+        if score >= beta:
+            return 'lower'
+        return 'exact'
+    
+    def quiescence(self, alpha, beta, maximizing, h, budget):
+        """
+        Extend the search past the horizon with forcing moves only
+        
+        A side that already has five has won; a side that can complete
+        five wins; a side facing a five must block it. Otherwise it may
+        stand pat on the static evaluation or make a four, until the
+        position is quiet or budget plies are used.
+        
+        Polls the deadline like minimax: both count into nodes_evaluated,
+        so every multiple of _TIME_CHECK_INTERVAL lands in one of them.
+        """
+        self.nodes_evaluated += 1
+        if (not self.nodes_evaluated % _TIME_CHECK_INTERVAL
+                and time.monotonic() >= self.deadline):
+            raise TimeUp
+        
+        game = self.game
+        mover = self.player if maximizing else self.opponent
+        other = self.opponent if maximizing else self.player
+        
+        # The move that led here may have made five; the game is over
+        # before the mover's own threats count
+        if game.has_five(other):
+            return -self.FIVE if maximizing else self.FIVE
+        
+        if game.five_completions(mover):
+            return self.FIVE if maximizing else -self.FIVE
+        
+        blocks = game.five_completions(other)
+        if blocks:
+            # No standing pat: anything but a block loses
+            best = -_INF if maximizing else _INF
+            forcing = blocks
+        else:
+            best = self.evaluate_board(h)
+            if budget == 0:
+                return best
+            if maximizing:
+                if best >= beta:
+                    return best
+                alpha = max(alpha, best)
+            else:
+                if best <= alpha:
+                    return best
+                beta = min(beta, best)
+            forcing = game.run_completions(mover, 4)
+        
+        if budget == 0 or not forcing:
+            return self.evaluate_board(h) if blocks else best
+        
+        tt = self.transposition_table
+        keys = tt.zobrist[PIECE_IDX[mover]]
+        size = tt.size
+        
+        for row, col in game.cells(forcing):
+            game.place(row, col, mover)
+            try:
+                score = self.quiescence(alpha, beta, not maximizing,
+                                        h ^ keys[row * size + col], budget - 1)
+            finally:
+                game.unplace(row, col)
+            
+            if maximizing:
+                best = max(best, score)
+                alpha = max(alpha, score)
+            else:
+                best = min(best, score)
+                beta = min(beta, score)
+            if beta <= alpha:
+                break
+        
+        return best
+    
+    def evaluate_board(self, h=None):
         """
         Evaluate board position
+        
+        Both sides share one empty-cell mask, so the board is only
+        unpacked once per leaf. When the Zobrist hash h is given the
+        score is memoized for the rest of the search, since the same
+        leaf is reached through many move orders.
         """
-        ai_score = self.count_patterns(self.player)
-        opp_score = self.count_patterns(self.opponent)
-        return ai_score - opp_score
+        if h is not None:
+            score = self._eval_cache.get(h)
+            if score is None:
+                score = self._eval_cache[h] = self.evaluate_board()
+            return score
+        
+        game = self.game
+        ai_stones = game.bitboards[self.player]
+        opp_stones = game.bitboards[self.opponent]
+        empty = game.board_mask & ~(ai_stones | opp_stones)
+        return (self._score_runs(ai_stones, empty)
+                - self._score_runs(opp_stones, empty))
     
     def count_patterns(self, player):
         """
         Count patterns for player
         """
-        score = 0
-        board = self.game.board
-        size = self.game.board_size
-        
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        checked = set()
+        game = self.game
+        opponent = 'X' if player == 'O' else 'O'
+        stones = game.bitboards[player]
+        empty = game.board_mask & ~(stones | game.bitboards[opponent])
+        return self._score_runs(stones, empty)
+    
+    def facing_threat(self, maximizing):
+        """
+        Does the side to move face an open three or worse?
         
-        for row in range(size):
-            for col in range(size):
-                if board[row][col] != player:
-                    continue
-                
-                for dr, dc in directions:
-                    key = (row, col, dr, dc)
-                    if key in checked:
-                        continue
-                    
-                    length = 0
-                    r, c = row, col
-                    
-                    while (0 <= r < size and 0 <= c < size and 
-                           board[r][c] == player):
-                        length += 1
-                        checked.add((r, c, dr, dc))
-                        r += dr
-                        c += dc
-                    
-                    # Check blocking
-                    start_r, start_c = row - dr, col - dc
-                    start_blocked = not (0 <= start_r < size and 0 <= start_c < size) or \
-                                   board[start_r][start_c] != ' '
-                    
-                    end_r, end_c = row + dr * length, col + dc * length
-                    end_blocked = not (0 <= end_r < size and 0 <= end_c < size) or \
-                                 board[end_r][end_c] != ' '
-                    
-                    # Score pattern
-                    if length >= 5:
-                        score += self.FIVE
-                    elif length == 4:
-                        score += self.OPEN_FOUR if not (start_blocked or end_blocked) else self.BLOCKED_FOUR
-                    elif length == 3:
-                        score += self.OPEN_THREE if not (start_blocked or end_blocked) else self.BLOCKED_THREE
-                    elif length == 2:
-                        score += self.OPEN_TWO if not (start_blocked or end_blocked) else self.BLOCKED_TWO
+        Passing is only safe when the other side cannot build a winning
+        threat with its extra move.
+        """
+        other = self.opponent if maximizing else self.player
+        return self.count_patterns(other) >= self.OPEN_THREE
+    
+    def _score_runs(self, stones, empty):
+        """
+        Score every run of stones on a bitboard
         
-        return score
+        Dispatches to a scorer compiled for the game's board geometry;
+        it is rebuilt only if the board size changes (e.g. a loaded game).
+        """
+        steps = self.game.steps
+        if steps is not self._scorer_steps:
+            self._scorer = _compile_run_scorer(steps, self._run_scores, self.FIVE)
+            self._scorer_steps = steps
+        return self._scorer(stones, empty)
     
-    def get_threat_space_moves(self, radius=2):
+    def get_threat_space_moves(self):
         """
         Get moves in threat space (near existing stones)
         MAJOR OPTIMIZATION: Reduces branching factor dramatically
+        
+        Reads the game's incrementally maintained neighbor counts
+        (radius GomokuGame.NEIGHBOR_RADIUS) instead of scanning the board.
         """
-        moves = set()
-        board = self.game.board
-        size = self.game.board_size
+        game = self.game
         
         # Empty board - return center
-        if all(board[r][c] == ' ' for r in range(size) for c in range(size)):
+        if not (game.bitboards['X'] | game.bitboards['O']):
+            size = game.board_size
             return [(size // 2, size // 2)]
         
-        # Find all occupied positions
-        for row in range(size):
-            for col in range(size):
-                if board[row][col] != ' ':
-                    # Add neighbors within radius
-                    for dr in range(-radius, radius + 1):
-                        for dc in range(-radius, radius + 1):
-                            r, c = row + dr, col + dc
-                            if (0 <= r < size and 0 <= c < size and 
-                                board[r][c] == ' '):
-                                moves.add((r, c))
-        
-        return list(moves)
+        board = game.board
+        return [(r, c) for r, c in game.neighbor_count if board[r][c] == ' ']
     
-    def advanced_move_ordering(self, moves, tt_best_move=None):
+    def advanced_move_ordering(self, moves, tt_best_move=None, depth=None):
         """
         Advanced move ordering for better alpha-beta pruning
         Priority: TT Best Move > Win > Block > Threats > Proximity
+        
+        Wins and blocks come from one five_completions bitboard per side
+        for the whole batch, so each candidate is a bit test rather than
+        a trial move.
+        
+        Inside the tree (depth given) the threat analysis is replaced by
+        the cheap killer and history heuristics:
+        TT Best Move > Win > Block > Killer > History + Proximity
         """
         if not moves:
             return moves
         
+        game = self.game
+        stride = game.stride
+        wins = game.five_completions(self.player)
+        blocks = game.five_completions(self.opponent)
+        get_proximity_score = self.get_proximity_score
+        if depth is None:
+            evaluate_move_threats = self.evaluate_move_threats
+        else:
+            killers = self.killers[depth]
+            history = self.history
+        
         scored_moves = []
         
         for move in moves:
-            score = 0
+            # 4. Proximity to stones
+            score = get_proximity_score(move)
+            
+            # 3. Threat creation (root) or killers and history (tree)
+            if depth is None:
+                score += evaluate_move_threats(move)
+            elif move in killers:
+                score += 10000
+            else:
+                score += history[move[0]][move[1]]
             
             # 0. TT best move from previous search (HIGHEST priority)
-            if tt_best_move and move == tt_best_move:
+            if move == tt_best_move:
                 score += 10000000
             
-            # 1. Winning moves
-            if self.is_winning_move(move, self.player):
+            # 1. Winning moves, 2. Blocking opponent wins
+            bit = 1 << (move[0] * stride + move[1])
+            if wins & bit:
                 score += 1000000
-            
-            # 2. Blocking opponent wins
-            elif self.is_winning_move(move, self.opponent):
+            elif blocks & bit:
                 score += 100000
             
-            # 3. Threat creation
-            threat_score = self.evaluate_move_threats(move)
-            score += threat_score
-            
-            # 4. Proximity to stones
-            proximity = self.get_proximity_score(move)
-            score += proximity
-            
             scored_moves.append((score, move))
         
         # Sort descending
         scored_moves.sort(reverse=True, key=lambda x: x[0])
         return [move for _, move in scored_moves]
     
+    def reset_heuristics(self):
+        """Clear the killer moves and history table before a new search"""
+        size = self.game.board_size
+        self.killers = [[None, None] for _ in range(self.max_depth + 1)]
+        self.history = [[0] * size for _ in range(size)]
+    
+    def record_cutoff(self, move, depth):
+        """Remember a move that caused a beta cutoff at this depth"""
+        killers = self.killers[depth]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move[0]][move[1]] += depth * depth
+    
     def evaluate_move_threats(self, move):
         """
         Evaluate threats created by this move
@@ -648,11 +1012,8 @@ class MinimaxAI:
         row, col = move
         score = 0
         
-        # Simulate move
-        original = self.game.board[row][col]
-        self.game.board[row][col] = self.player
-        
-        # Count what patterns this creates
+        # Count what patterns this creates (the scan treats the cell as
+        # ours already, so there is no need to place the stone)
         patterns = self.analyze_position_patterns(row, col, self.player)
         
         # Score threats
@@ -665,9 +1026,6 @@ class MinimaxAI:
         if 'BLOCKED_THREE' in patterns:
             score += 100
         
-        # Undo
-        self.game.board[row][col] = original
-        
         return score
     
     def analyze_position_patterns(self, row, col, player):
@@ -675,41 +1033,33 @@ class MinimaxAI:
         Analyze what patterns exist at this position
         """
         patterns = []
-        board = self.game.board
-        size = self.game.board_size
-        
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        game = self.game
+        stones = game.bitboards[player]
+        opponent = 'X' if player == 'O' else 'O'
+        empty = game.board_mask & ~(stones | game.bitboards[opponent])
+        bit = 1 << (row * game.stride + col)
         
-        for dr, dc in directions:
+        for step in game.steps:
             length = 1  # Count current position
             
             # Count forward
-            r, c = row + dr, col + dc
-            while (0 <= r < size and 0 <= c < size and board[r][c] == player):
+            probe = bit << step
+            while stones & probe:
                 length += 1
-                r += dr
-                c += dc
-            front_blocked = not (0 <= r < size and 0 <= c < size) or board[r][c] != ' '
+                probe <<= step
+            front_open = empty & probe
             
             # Count backward
-            r, c = row - dr, col - dc
-            while (0 <= r < size and 0 <= c < size and board[r][c] == player):
+            probe = bit >> step
+            while stones & probe:
                 length += 1
-                r -= dr
-                c -= dc
-            back_blocked = not (0 <= r < size and 0 <= c < size) or board[r][c] != ' '
+                probe >>= step
+            both_open = bool(front_open and empty & probe)
             
             # Classify pattern
-            if length >= 4:
-                if not front_blocked and not back_blocked:
-                    patterns.append('OPEN_FOUR')
-                else:
-                    patterns.append('BLOCKED_FOUR')
-            elif length == 3:
-                if not front_blocked and not back_blocked:
-                    patterns.append('OPEN_THREE')
-                else:
-                    patterns.append('BLOCKED_THREE')
+            pattern = _RUN_PATTERNS[min(length, 4)][both_open]
+            if pattern:
+                patterns.append(pattern)
         
         return patterns
     
@@ -717,26 +1067,18 @@ class MinimaxAI:
         """
         Score based on proximity to existing stones
         """
-        row, col = move
-        min_dist = float('inf')
-        
-        for r in range(self.game.board_size):
-            for c in range(self.game.board_size):
-                if self.game.board[r][c] != ' ':
-                    dist = abs(row - r) + abs(col - c)
-                    min_dist = min(min_dist, dist)
+        min_dist = self.game.nearest_stone_distance(*move)
+        if min_dist is None:
+            return 0
         
         # Closer is better (max score 10)
         return max(0, 10 - min_dist)
     
     def is_winning_move(self, move, player):
         """Check if move wins immediately"""
-        row, col = move
-        original = self.game.board[row][col]
-        self.game.board[row][col] = player
-        is_win = self.game.check_winner(row, col, player)
-        self.game.board[row][col] = original
-        return is_win
+        # check_winner counts the stone at (row, col) itself, so there is
+        # no need to place it
+        return self.game.check_winner(*move, player)
     
     def is_game_over(self):
         """Check if game ended"""
@@ -750,3 +1092,37 @@ class MinimaxAI:
         """Emergency fallback move"""
         moves = self.get_threat_space_moves()
         return moves[0] if moves else (7, 7)
+
+
+# Per-process AI reused by _search_root_move, keyed by (player, board size)
+_worker_ais = {}
+
+
+def _search_root_move(board, player, depth, move, alpha, beta, deadline):
+    """
+    Score one root move in a worker process (see MinimaxAI.workers)
+    
+    Returns (score, nodes searched); the score is None if the deadline
+    passed first.
+    """
+    ai = _worker_ais.get((player, len(board)))
+    if ai is None:
+        ai = MinimaxAI(GomokuGame(len(board)), player, depth,
+                       use_opening_book=False)
+        _worker_ais[(player, len(board))] = ai
+    
+    ai.game.load_board(board)
+    ai.max_depth = depth
+    ai.deadline = deadline
+    ai.nodes_evaluated = 0
+    ai._eval_cache.clear()
+    ai.reset_heuristics()
+    
+    row, col = move
+    ai.game.place(row, col, player)
+    try:
+        score = ai.minimax(depth - 1, alpha, beta, False,
+                           ai.transposition_table.hash_board(ai.game.board))
+    except TimeUp:
+        score = None
+    return score, ai.nodes_evaluated
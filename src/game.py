@@ -3,10 +3,15 @@ Gomoku Game Logic Module
 Handles game board, moves, and win detection
 """
 
+from collections import defaultdict
+
 
 class GomokuGame:
     """Gomoku (Five in a Row) game logic"""
     
+    # Cells within this many rows/columns of a stone count as its neighbors
+    NEIGHBOR_RADIUS = 2
+    
     def __init__(self, board_size=15):
         self.board_size = board_size
         self.board = [[' ' for _ in range(board_size)] for _ in range(board_size)]
@@ -14,6 +19,23 @@ class GomokuGame:
         self.winner = None
         self.game_over = False
         
+        # One bitboard per player alongside the board: cell (row, col) is
+        # bit row * stride + col. The stride leaves one always-empty guard
+        # bit after each row, so shifting along a row or diagonal can
+        # never wrap around into the next row.
+        self.stride = board_size + 1
+        self.steps = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.board_mask = self._board_mask()
+        self.bitboards = {'X': 0, 'O': 0}
+        
+        # How many stones lie within NEIGHBOR_RADIUS of each cell, kept up
+        # to date by place/unplace so move generators can read the
+        # neighborhood instead of scanning the board. Cells drop out when
+        # their count falls back to zero.
+        self.neighbor_count = defaultdict(int)
+        self._neighbor_cells = {}
+        self._distance_rings = {}
+        
     def make_move(self, row, col, player):
         """
         Make a move on the board
@@ -22,7 +44,7 @@ class GomokuGame:
         if not self.is_valid_move(row, col):
             return False
             
-        self.board[row][col] = player
+        self.place(row, col, player)
         
         # Check for winner
         if self.check_winner(row, col, player):
@@ -37,33 +59,178 @@ class GomokuGame:
             return False
         return self.board[row][col] == ' '
     
+    def place(self, row, col, player):
+        """
+        Put a stone on the board without validating or checking for a win
+        
+        All board writes (including the AI's trial moves) go through
+        place/unplace so the bitboards stay in sync.
+        """
+        self.board[row][col] = player
+        self.bitboards[player] |= 1 << (row * self.stride + col)
+        counts = self.neighbor_count
+        for cell in self.neighbors(row, col):
+            counts[cell] += 1
+    
+    def unplace(self, row, col):
+        """Take back a stone put down with place"""
+        player = self.board[row][col]
+        if player != ' ':
+            self.board[row][col] = ' '
+            self.bitboards[player] &= ~(1 << (row * self.stride + col))
+            counts = self.neighbor_count
+            for cell in self.neighbors(row, col):
+                if counts[cell] == 1:
+                    del counts[cell]
+                else:
+                    counts[cell] -= 1
+    
+    def neighbors(self, row, col):
+        """On-board cells within NEIGHBOR_RADIUS of (row, col), itself excluded"""
+        cells = self._neighbor_cells.get((row, col))
+        if cells is None:
+            radius = self.NEIGHBOR_RADIUS
+            size = self.board_size
+            cells = [(r, c)
+                     for r in range(max(0, row - radius), min(size, row + radius + 1))
+                     for c in range(max(0, col - radius), min(size, col + radius + 1))
+                     if (r, c) != (row, col)]
+            self._neighbor_cells[(row, col)] = cells
+        return cells
+    
+    def nearest_stone_distance(self, row, col):
+        """
+        Manhattan distance from (row, col) to the nearest stone, or None
+        on an empty board
+        
+        Tests the bitboards against precomputed rings of cells at each
+        distance, nearest first, so a cell next to a stone costs one AND.
+        """
+        stones = self.bitboards['X'] | self.bitboards['O']
+        if not stones:
+            return None
+        rings = self._distance_rings.get((row, col))
+        if rings is None:
+            rings = self._build_distance_rings(row, col)
+        for distance, ring in enumerate(rings):
+            if stones & ring:
+                return distance
+        return None
+    
+    def _build_distance_rings(self, row, col):
+        """Bitboards of the cells at Manhattan distance 0, 1, 2, ... from (row, col)"""
+        size = self.board_size
+        rings = [0] * (2 * size - 1)
+        for r in range(size):
+            for c in range(size):
+                rings[abs(r - row) + abs(c - col)] |= 1 << (r * self.stride + c)
+        while not rings[-1]:
+            rings.pop()
+        self._distance_rings[(row, col)] = rings
+        return rings
+    
+    def load_board(self, board):
+        """Replace the board (e.g. from a save) and rebuild the bitboards"""
+        self.board = board
+        self.board_size = len(board)
+        self.stride = self.board_size + 1
+        self.steps = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.board_mask = self._board_mask()
+        self.bitboards = {'X': 0, 'O': 0}
+        self.neighbor_count = defaultdict(int)
+        self._neighbor_cells = {}
+        self._distance_rings = {}
+        for row, cells in enumerate(board):
+            for col, cell in enumerate(cells):
+                if cell != ' ':
+                    self.place(row, col, cell)
+    
+    def _board_mask(self):
+        """Bitboard with every on-board cell set (guard bits clear)"""
+        row_bits = (1 << self.board_size) - 1
+        mask = 0
+        for row in range(self.board_size):
+            mask |= row_bits << (row * self.stride)
+        return mask
+    
     def check_winner(self, row, col, player):
         """Check if the last move resulted in a win"""
-        directions = [
-            [(0, 1), (0, -1)],   # Horizontal
-            [(1, 0), (-1, 0)],   # Vertical
-            [(1, 1), (-1, -1)],  # Diagonal \
-            [(1, -1), (-1, 1)]   # Diagonal /
-        ]
+        bit = 1 << (row * self.stride + col)
+        stones = self.bitboards[player] | bit  # Count the piece just placed
         
-        for direction_pair in directions:
-            count = 1  # Count the piece just placed
-            
-            # Check both directions
-            for dr, dc in direction_pair:
-                r, c = row + dr, col + dc
-                while (0 <= r < self.board_size and 
-                       0 <= c < self.board_size and 
-                       self.board[r][c] == player):
-                    count += 1
-                    r += dr
-                    c += dc
+        for step in self.steps:
+            # Bits that start five in a row along this direction
+            pairs = stones & (stones >> step)
+            fours = pairs & (pairs >> 2 * step)
+            fives = fours & (stones >> 4 * step)
+            if not fives:
+                continue
             
-            if count >= 5:
+            # Does one of them run through the move? A five through it
+            # starts at most four steps before it.
+            window = bit | (bit >> step)
+            window |= window >> 2 * step
+            window |= bit >> 4 * step
+            if fives & window:
                 return True
         
         return False
     
+    def has_five(self, player):
+        """
+        Does player have five in a row anywhere on the board?
+        
+        Unlike check_winner this needs no last move, so the AI's trial
+        moves (which go through place, not make_move) can be tested too.
+        """
+        stones = self.bitboards[player]
+        for step in self.steps:
+            pairs = stones & (stones >> step)
+            fours = pairs & (pairs >> 2 * step)
+            if fours & (stones >> 4 * step):
+                return True
+        return False
+    
+    def cells(self, bits):
+        """(row, col) of every set bit in a bitboard, lowest index first"""
+        stride = self.stride
+        while bits:
+            low = bits & -bits
+            yield divmod(low.bit_length() - 1, stride)
+            bits ^= low
+    
+    def five_completions(self, player):
+        """
+        Bitboard of the empty cells where player would complete five in a
+        row; agrees with check_winner on every empty cell
+        """
+        return self.run_completions(player, 5)
+    
+    def run_completions(self, player, length):
+        """
+        Bitboard of the empty cells where player would get a run of at
+        least length stones through the cell, for all cells at once
+        
+        A cell qualifies when some length-cell window through it holds
+        length - 1 of the player's stones; each (direction, hole) pair is
+        one AND of shifted bitboards.
+        """
+        opponent = 'O' if player == 'X' else 'X'
+        stones = self.bitboards[player]
+        empty = self.board_mask & ~(stones | self.bitboards[opponent])
+        cells = 0
+        for step in self.steps:
+            # Bit s of shifted[k]: a stone at s + k * step
+            shifted = [stones >> (k * step) for k in range(length)]
+            for hole in range(length):
+                starts = empty >> (hole * step)
+                for k in range(length):
+                    if k != hole:
+                        starts &= shifted[k]
+                if starts:
+                    cells |= starts << (hole * step)
+        return cells
+    
     def get_board_state(self):
         """Get current board state as a string"""
         return '\n'.join([''.join(row) for row in self.board])
@@ -71,6 +238,8 @@ class GomokuGame:
     def reset(self):
         """Reset the game"""
         self.board = [[' ' for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.bitboards = {'X': 0, 'O': 0}
+        self.neighbor_count.clear()
         self.current_player = 'X'
         self.winner = None
         self.game_over = False
@@ -3,11 +3,18 @@ Game State Manager - Save and Load game state
 Handles serialization of game state to JSON
 """
 
-import json
+import base64
 import os
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+from src import json_codec
+
+# str.translate tables turning a flattened board into one player's bit string
+_X_DIGITS = str.maketrans('XO ', '100')
+_O_DIGITS = str.maketrans('XO ', '010')
+
 
 class GameStateManager:
     """
@@ -17,6 +24,14 @@ class GameStateManager:
     DEFAULT_SAVE_DIR = 'saves'
     DEFAULT_SAVE_FILE = 'gomoku_save.json'
     
+    # has_saved_game answers from here for a short while instead of hitting
+    # the filesystem on every menu refresh: (filename, checked_at, exists)
+    EXISTS_CACHE_TTL = 0.5
+    _exists_cache = None
+    
+    # Fields mirrored into the '<save>.meta' sidecar for get_save_info
+    META_FIELDS = ('timestamp', 'game_mode', 'ai_difficulty', 'current_player')
+    
     @staticmethod
     def ensure_save_directory():
         """Create saves directory if it doesn't exist"""
@@ -57,12 +72,16 @@ class GameStateManager:
                 'game_over': game.game_over,
                 'winner': game.winner,
                 'timestamp': datetime.now().isoformat(),
-                'version': '1.0'
+                'version': '2.0'
             }
             
-            # Write to file
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2, ensure_ascii=False)
+            GameStateManager._write_atomic(filename, json_codec.dumps(state, pretty=json_codec.PRETTY))
+            
+            # Small sidecar with just what get_save_info shows, written after
+            # the save so it is never older than the file it describes
+            meta = {key: state[key] for key in GameStateManager.META_FIELDS}
+            GameStateManager._write_atomic(filename + '.meta', json_codec.dumps(meta))
+            GameStateManager._exists_cache = None
             
             print(f"[Save] Game saved to {filename}")
             return True
@@ -71,6 +90,25 @@ class GameStateManager:
             print(f"[Save Error] Failed to save game: {e}")
             return False
     
+    @staticmethod
+    def _write_atomic(filename, data: bytes):
+        """
+        Write data to filename through a temporary file
+        
+        The bytes go to a temporary file in one go and are then swapped in:
+        a crash mid-write leaves the previous file intact, never a torn one.
+        
+        Args:
+            filename: Destination path
+            data: Encoded file contents
+        """
+        temp_file = filename + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
+    
     @staticmethod
     def load_game(filename=None) -> Optional[Dict[str, Any]]:
         """
@@ -94,8 +132,8 @@ class GameStateManager:
                 return None
             
             # Read from file
-            with open(filename, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+            with open(filename, 'rb') as f:
+                state = json_codec.loads(f.read())
             
             # Deserialize board
             state['board'] = GameStateManager.deserialize_board(state['board'])
@@ -112,6 +150,9 @@ class GameStateManager:
         """
         Check if a saved game exists
         
+        The answer is cached for EXISTS_CACHE_TTL seconds; saving or deleting
+        through this class clears it.
+        
         Args:
             filename: Optional custom filename
             
@@ -124,7 +165,15 @@ class GameStateManager:
                 GameStateManager.DEFAULT_SAVE_FILE
             )
         
-        return os.path.exists(filename)
+        now = time.monotonic()
+        cached = GameStateManager._exists_cache
+        if (cached is not None and cached[0] == filename
+                and now - cached[1] < GameStateManager.EXISTS_CACHE_TTL):
+            return cached[2]
+        
+        exists = os.path.isfile(filename)
+        GameStateManager._exists_cache = (filename, now, exists)
+        return exists
     
     @staticmethod
     def delete_saved_game(filename=None) -> bool:
@@ -146,6 +195,9 @@ class GameStateManager:
             
             if os.path.exists(filename):
                 os.remove(filename)
+                if os.path.exists(filename + '.meta'):
+                    os.remove(filename + '.meta')
+                GameStateManager._exists_cache = None
                 print(f"[Delete] Saved game deleted: {filename}")
                 return True
             return False
@@ -155,17 +207,32 @@ class GameStateManager:
             return False
     
     @staticmethod
-    def serialize_board(board) -> list:
+    def serialize_board(board) -> dict:
         """
         Convert 2D board to serializable format
         
+        Each player's stones are packed into one integer (cell (row, col)
+        is bit row * size + col) and stored base64-encoded.
+        
         Args:
             board: 2D list representing the board
             
         Returns:
-            Serialized board (list of lists)
+            Serialized board: {'size': n, 'X': str, 'O': str}
         """
-        return [row[:] for row in board]
+        size = len(board)
+        # Flatten in C and read each player's cells as one binary literal;
+        # reversed so that cell 0 lands on the lowest bit
+        flat = ''.join(map(''.join, board))[::-1]
+        x_bits = int(flat.translate(_X_DIGITS) or '0', 2)
+        o_bits = int(flat.translate(_O_DIGITS) or '0', 2)
+        
+        length = (size * size + 7) // 8
+        return {
+            'size': size,
+            'X': base64.b64encode(x_bits.to_bytes(length, 'little')).decode('ascii'),
+            'O': base64.b64encode(o_bits.to_bytes(length, 'little')).decode('ascii')
+        }
     
     @staticmethod
     def deserialize_board(data) -> list:
@@ -173,12 +240,25 @@ class GameStateManager:
         Convert serialized data back to board format
         
         Args:
-            data: Serialized board data
+            data: Serialized board data (version 1.0 saves store a plain
+                  list of lists)
             
         Returns:
             2D list representing the board
         """
-        return [row[:] for row in data]
+        if isinstance(data, list):
+            return [row[:] for row in data]
+        
+        size = data['size']
+        board = [[' '] * size for _ in range(size)]
+        for player in ('X', 'O'):
+            bits = int.from_bytes(base64.b64decode(data[player]), 'little')
+            while bits:
+                low = bits & -bits
+                row, col = divmod(low.bit_length() - 1, size)
+                board[row][col] = player
+                bits ^= low
+        return board
     
     @staticmethod
     def get_save_info(filename=None) -> Optional[Dict[str, str]]:
@@ -198,11 +278,25 @@ class GameStateManager:
                     GameStateManager.DEFAULT_SAVE_FILE
                 )
             
-            if not os.path.exists(filename):
+            try:
+                save_mtime = os.stat(filename).st_mtime
+            except OSError:
                 return None
             
-            with open(filename, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+            # Prefer the sidecar; saves from older versions (or a sidecar
+            # left behind by an outside edit) fall back to the full file
+            state = None
+            meta_file = filename + '.meta'
+            try:
+                if os.stat(meta_file).st_mtime >= save_mtime:
+                    with open(meta_file, 'rb') as f:
+                        state = json_codec.loads(f.read())
+            except (OSError, ValueError):
+                state = None
+            
+            if state is None:
+                with open(filename, 'rb') as f:
+                    state = json_codec.loads(f.read())
             
             return {
                 'timestamp': state.get('timestamp', 'Unknown'),
@@ -3,11 +3,31 @@ Game Statistics Tracker
 Tracks wins, losses, and game history
 """
 
-import json
+import atexit
 import os
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from src import json_codec
+
+# One finished game in the history; written to file as a dict
+HistoryEntry = namedtuple('HistoryEntry', 'timestamp mode result difficulty')
+
+# Live trackers with writes that may still be pending; held weakly so the
+# exit hook does not keep discarded ones alive
+_instances = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    """Write every live tracker's pending statistics at interpreter exit"""
+    for stats in list(_instances):
+        stats.flush()
+
 
 class GameStatistics:
     """
@@ -15,21 +35,52 @@ class GameStatistics:
     """
     
     STATS_FILE = 'saves/statistics.json'
+    FLUSH_INTERVAL = 2.0  # Seconds between writes when games come in quickly
+    HISTORY_LIMIT = 100  # Most recent games kept in the history
     
     def __init__(self):
         self.stats = self.load_statistics()
+        
+        # Writes are batched: record_game marks the stats dirty and they
+        # are flushed at most once per FLUSH_INTERVAL, and at exit
+        self._dirty = False
+        self._last_flush = 0.0
+        self._flush_timer = None
+        self._flush_lock = threading.RLock()
+        _instances.add(self)
+        
+        # Derived values, cleared whenever the statistics change
+        self._winrate_cache = {}
+        self._summary_cache = None
+        self._stats_bytes = None  # Encoded file contents, built on the next save
+    
+    def _invalidate_caches(self):
+        """Forget cached win rates, summary and encoding after the stats change"""
+        self._winrate_cache.clear()
+        self._summary_cache = None
+        self._stats_bytes = None
     
     @staticmethod
     def load_statistics() -> Dict:
         """Load statistics from file"""
         try:
             if os.path.exists(GameStatistics.STATS_FILE):
-                with open(GameStatistics.STATS_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(GameStatistics.STATS_FILE, 'rb') as f:
+                    stats = json_codec.loads(f.read())
+                stats['history'] = deque(
+                    (HistoryEntry._make(entry.get(field) for field in HistoryEntry._fields)
+                     for entry in stats['history']),
+                    maxlen=GameStatistics.HISTORY_LIMIT
+                )
+                return stats
         except Exception as e:
             print(f"[Stats] Error loading statistics: {e}")
         
-        # Return default structure
+        return GameStatistics.default_statistics()
+    
+    @staticmethod
+    def default_statistics() -> Dict:
+        """Statistics with no games recorded"""
         return {
             'singleplayer': {
                 'total_games': 0,
@@ -49,21 +100,55 @@ class GameStatistics:
                 'losses': 0,
                 'draws': 0
             },
-            'history': []
+            'history': deque(maxlen=GameStatistics.HISTORY_LIMIT)
         }
     
     def save_statistics(self) -> bool:
         """Save statistics to file"""
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(GameStatistics.STATS_FILE), exist_ok=True)
-            
-            with open(GameStatistics.STATS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            print(f"[Stats] Error saving statistics: {e}")
-            return False
+        with self._flush_lock:
+            try:
+                # Ensure directory exists
+                os.makedirs(os.path.dirname(GameStatistics.STATS_FILE), exist_ok=True)
+                
+                # Write a temporary file and swap it in, so a crash mid-write
+                # never leaves a truncated statistics file behind
+                if self._stats_bytes is None:
+                    # The history deque is written as a JSON array of objects
+                    history = [entry._asdict() for entry in self.stats['history']]
+                    stats = dict(self.stats, history=history)
+                    self._stats_bytes = json_codec.dumps(stats, pretty=json_codec.PRETTY)
+                
+                temp_file = GameStatistics.STATS_FILE + '.tmp'
+                with open(temp_file, 'wb') as f:
+                    f.write(self._stats_bytes)
+                os.replace(temp_file, GameStatistics.STATS_FILE)
+                
+                self._dirty = False
+                self._last_flush = time.monotonic()
+                return True
+            except Exception as e:
+                print(f"[Stats] Error saving statistics: {e}")
+                return False
+    
+    def flush(self):
+        """Write pending statistics to file, if there are any"""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._dirty:
+                self.save_statistics()
+    
+    def _schedule_flush(self):
+        """Flush now, or once FLUSH_INTERVAL has passed since the last write"""
+        with self._flush_lock:
+            wait = self._last_flush + self.FLUSH_INTERVAL - time.monotonic()
+            if wait <= 0:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(wait, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
     
     def record_game(self, game_mode: str, result: str, difficulty: Optional[str] = None):
         """
@@ -74,46 +159,44 @@ class GameStatistics:
             result: 'win', 'loss', or 'draw'
             difficulty: AI difficulty (for singleplayer)
         """
-        timestamp = datetime.now().isoformat()
-        
-        # Update mode statistics
-        mode_stats = self.stats[game_mode]
-        mode_stats['total_games'] += 1
-        
-        if result == 'win':
-            mode_stats['wins'] += 1
-        elif result == 'loss':
-            mode_stats['losses'] += 1
-        elif result == 'draw':
-            mode_stats['draws'] += 1
-        
-        # Update difficulty statistics (for singleplayer)
-        if game_mode == 'singleplayer' and difficulty:
-            diff_stats = mode_stats['by_difficulty'].get(difficulty)
-            if diff_stats:
-                diff_stats['games'] += 1
-                if result == 'win':
-                    diff_stats['wins'] += 1
-                elif result == 'loss':
-                    diff_stats['losses'] += 1
-                elif result == 'draw':
-                    diff_stats['draws'] += 1
-        
-        # Add to history
-        history_entry = {
-            'timestamp': timestamp,
-            'mode': game_mode,
-            'result': result,
-            'difficulty': difficulty
-        }
-        self.stats['history'].append(history_entry)
-        
-        # Keep only last 100 games in history
-        if len(self.stats['history']) > 100:
-            self.stats['history'] = self.stats['history'][-100:]
-        
-        # Save to file
-        self.save_statistics()
+        # The flush timer may be writing the stats from another thread
+        with self._flush_lock:
+            timestamp = datetime.now().isoformat()
+            
+            # Update mode statistics
+            mode_stats = self.stats[game_mode]
+            mode_stats['total_games'] += 1
+            
+            if result == 'win':
+                mode_stats['wins'] += 1
+            elif result == 'loss':
+                mode_stats['losses'] += 1
+            elif result == 'draw':
+                mode_stats['draws'] += 1
+            
+            # Update difficulty statistics (for singleplayer)
+            if game_mode == 'singleplayer' and difficulty:
+                diff_stats = mode_stats['by_difficulty'].get(difficulty)
+                if diff_stats:
+                    diff_stats['games'] += 1
+                    if result == 'win':
+                        diff_stats['wins'] += 1
+                    elif result == 'loss':
+                        diff_stats['losses'] += 1
+                    elif result == 'draw':
+                        diff_stats['draws'] += 1
+            
+            # Add to history
+            # (the deque keeps only the last HISTORY_LIMIT games)
+            self.stats['history'].append(
+                HistoryEntry(timestamp, game_mode, result, difficulty)
+            )
+            
+            self._invalidate_caches()
+            
+            # Save to file (batched)
+            self._dirty = True
+            self._schedule_flush()
     
     def get_win_rate(self, game_mode: str, difficulty: Optional[str] = None) -> float:
         """
@@ -126,6 +209,14 @@ class GameStatistics:
         Returns:
             Win rate as percentage (0-100)
         """
+        key = (game_mode, difficulty)
+        rate = self._winrate_cache.get(key)
+        if rate is None:
+            rate = self._winrate_cache[key] = self._compute_win_rate(game_mode, difficulty)
+        return rate
+    
+    def _compute_win_rate(self, game_mode: str, difficulty: Optional[str]) -> float:
+        """Win rate straight from the counters (see get_win_rate)"""
         if game_mode == 'singleplayer' and difficulty:
             stats = self.stats['singleplayer']['by_difficulty'].get(difficulty, {})
         else:
@@ -146,6 +237,9 @@ class GameStatistics:
         Returns:
             Formatted string with statistics
         """
+        if self._summary_cache is not None:
+            return self._summary_cache
+        
         sp = self.stats['singleplayer']
         mp = self.stats['multiplayer']
         
@@ -177,9 +271,18 @@ class GameStatistics:
         
         summary += "\n" + "═" * 50
         
+        self._summary_cache = summary
         return summary
     
     def reset_statistics(self):
         """Reset all statistics"""
-        self.stats = self.load_statistics()
-        self.save_statistics()
+        # Under the lock, so a pending flush can neither run mid-reset nor
+        # write the old stats over the new ones afterwards
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.stats = self.default_statistics()
+            self._invalidate_caches()
+            self._dirty = False
+            self.save_statistics()
@@ -0,0 +1,52 @@
+"""
+JSON Codec - Fast JSON encoding with a standard library fallback
+Uses orjson when it is installed, json otherwise; both work in bytes
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the game runs on the stdlib alone
+    orjson = None
+
+# Files are written compact; set GOMOKU_PRETTY_JSON=1 to indent them for reading
+PRETTY = os.environ.get('GOMOKU_PRETTY_JSON') == '1'
+
+
+def dumps(obj, pretty=False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON
+    
+    Args:
+        obj: JSON-serializable object
+        pretty: Indent with two spaces
+    
+    Returns:
+        Encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """
+    Decode UTF-8 JSON
+    
+    Args:
+        data: bytes (or str) holding one JSON document
+    
+    Returns:
+        Decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Raised by loads on malformed input, whichever backend is in use
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
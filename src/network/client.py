@@ -3,9 +3,10 @@ Gomoku Game Client with GUI
 Connects to game server and provides graphical interface
 """
 
+import queue
 import socket
+import struct
 import threading
-import json
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import sys
@@ -14,6 +15,19 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from game import GomokuGame
+import json_codec
+
+# Every message is a 4-byte big-endian length followed by that many bytes of JSON
+HEADER = struct.Struct('>I')
+# ...except moves sent to the server, which are a whole frame of their own:
+# the header, then a tag byte (JSON payloads start with '{'), row, col and a
+# reserved byte
+MOVE_TAG = 0x01
+MOVE_FRAME = struct.Struct('>IBBBx')
+MOVE_SIZE = MOVE_FRAME.size - HEADER.size
+
+# How often the Tk thread picks up messages from the reader thread
+INBOX_POLL_MS = 20
 
 
 class GomokuClient:
@@ -23,6 +37,10 @@ class GomokuClient:
         self.host = host
         self.port = port
         self.socket = None
+        self._recv_buf = bytearray()
+        # The reader thread only parses; drain_inbox handles messages on the Tk thread
+        self._inbox = queue.Queue()
+        self._drain_id = None
         self.player_symbol = None
         self.game_id = None
         self.my_turn = False
@@ -40,6 +58,7 @@ class GomokuClient:
         self.root.resizable(False, False)
         
         self.cell_size = 40
+        self.precompute_geometry()
         self.create_gui()
         
     def create_gui(self):
@@ -68,6 +87,7 @@ class GomokuClient:
         
         # Draw grid
         self.draw_board()
+        self.create_stones()
         
         # Bottom frame for buttons
         button_frame = tk.Frame(self.root)
@@ -100,32 +120,49 @@ class GomokuClient:
         )
         self.quit_button.pack(side=tk.LEFT, padx=5)
         
+    def precompute_geometry(self):
+        """Compute grid line and stone coordinates once; the board never resizes"""
+        cs = self.cell_size
+        extent = self.board_size * cs
+        
+        # Vertical lines, then horizontal lines
+        self._line_coords = (
+            [(i * cs, 0, i * cs, extent) for i in range(self.board_size + 1)] +
+            [(0, i * cs, extent, i * cs) for i in range(self.board_size + 1)]
+        )
+        
+        # Bounding box of the stone drawn in each cell
+        radius = cs // 2 - 3
+        self._stone_boxes = [
+            [(c * cs + cs // 2 - radius, r * cs + cs // 2 - radius,
+              c * cs + cs // 2 + radius, r * cs + cs // 2 + radius)
+             for c in range(self.board_size)]
+            for r in range(self.board_size)
+        ]
+    
     def draw_board(self):
         """Draw the game board grid"""
-        for i in range(self.board_size + 1):
-            # Vertical lines
-            x = i * self.cell_size
-            self.canvas.create_line(x, 0, x, self.board_size * self.cell_size)
-            
-            # Horizontal lines
-            y = i * self.cell_size
-            self.canvas.create_line(0, y, self.board_size * self.cell_size, y)
+        for coords in self._line_coords:
+            self.canvas.create_line(*coords)
+    
+    def create_stones(self):
+        """Create one hidden, reusable stone item per cell"""
+        self._stones = [
+            [self.canvas.create_oval(*box, width=2, state='hidden', tags='stone')
+             for box in row]
+            for row in self._stone_boxes
+        ]
     
     def draw_stone(self, row, col, player):
-        """Draw a stone on the board"""
-        x = col * self.cell_size + self.cell_size // 2
-        y = row * self.cell_size + self.cell_size // 2
-        radius = self.cell_size // 2 - 3
-        
+        """Show the stone on a cell in the player's colors"""
         color = 'black' if player == 'X' else 'white'
         outline = 'white' if player == 'X' else 'black'
         
-        self.canvas.create_oval(
-            x - radius, y - radius,
-            x + radius, y + radius,
+        self.canvas.itemconfig(
+            self._stones[row][col],
             fill=color,
             outline=outline,
-            width=2
+            state='normal'
         )
     
     def on_click(self, event):
@@ -137,7 +174,12 @@ class GomokuClient:
         col = event.x // self.cell_size
         row = event.y // self.cell_size
         
-        if not self.game.is_valid_move(row, col):
+        # A bit test covers occupancy and the rest of the bounds: clicks on
+        # the canvas edge land on the guard bit after the row or past the
+        # last row, neither of which is ever empty
+        game = self.game
+        empty = game.board_mask & ~(game.bitboards['X'] | game.bitboards['O'])
+        if col > game.board_size or not (empty >> (row * game.stride + col)) & 1:
             return
         
         # Make move locally
@@ -149,6 +191,13 @@ class GomokuClient:
         self.my_turn = False
         self.update_status("Opponent's turn...")
     
+    def configure_socket(self):
+        """Tune the connected socket for small, latency-sensitive messages"""
+        # Send each move immediately instead of letting Nagle hold it for an ACK
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Let the OS probe idle connections so a dead server surfaces as an error
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    
     def connect_to_server(self):
         """Connect to the game server"""
         try:
@@ -156,6 +205,7 @@ class GomokuClient:
             self.socket.settimeout(10)  # 10 second timeout
             self.socket.connect((self.host, self.port))
             self.socket.settimeout(None)  # Remove timeout after connection
+            self.configure_socket()
             self.connected = True
             
             self.connect_button.config(state=tk.DISABLED)
@@ -188,19 +238,32 @@ class GomokuClient:
             )
     
     def receive_messages(self):
-        """Receive messages from server"""
+        """Receive length-prefixed messages from server"""
+        buf = self._recv_buf = bytearray()
+        chunk = memoryview(bytearray(4096))
         try:
             while self.connected:
-                data = self.socket.recv(4096)
-                if not data:
+                n = self.socket.recv_into(chunk)
+                if not n:
                     break
+                buf += chunk[:n]
                 
-                try:
-                    message = json.loads(data.decode('utf-8'))
-                    self.handle_message(message)
-                except json.JSONDecodeError as je:
-                    print(f"[Client] Invalid JSON received: {je}")
-                    continue
+                # A read may hold several messages or only part of one
+                while len(buf) >= HEADER.size:
+                    (length,) = HEADER.unpack_from(buf)
+                    end = HEADER.size + length
+                    if len(buf) < end:
+                        break
+                    # Both JSON backends parse the bytearray slice as-is
+                    payload = buf[HEADER.size:end]
+                    del buf[:end]
+                    
+                    try:
+                        message = json_codec.loads(payload)
+                    except json_codec.JSONDecodeError as je:
+                        print(f"[Client] Invalid JSON received: {je}")
+                        continue
+                    self._inbox.put(message)
                 
         except ConnectionResetError:
             if self.connected:
@@ -210,28 +273,43 @@ class GomokuClient:
         except socket.error as se:
             if self.connected:
                 print(f"[Client] Socket error: {se}")
-                self.root.after(0, lambda: messagebox.showerror(
+                self.root.after(
+                    0, messagebox.showerror,
                     "Network Error",
                     f"Network error occurred: {se}"
-                ))
+                )
                 self.connected = False
         except Exception as e:
             if self.connected:
                 print(f"[Client] Error receiving message: {e}")
-                self.root.after(0, lambda: messagebox.showerror(
+                self.root.after(
+                    0, messagebox.showerror,
                     "Connection Lost",
                     f"Lost connection to server: {type(e).__name__}"
-                ))
+                )
                 self.connected = False
     
+    def drain_inbox(self):
+        """Dispatch queued server messages on the Tk thread, then poll again"""
+        self._drain_id = self.root.after(INBOX_POLL_MS, self.drain_inbox)
+        while True:
+            try:
+                message = self._inbox.get_nowait()
+            except queue.Empty:
+                return
+            self.handle_message(message)
+            if self._drain_id is None:
+                # quit_game ran; the widgets are gone
+                return
+    
     def handle_message(self, message):
-        """Handle different message types from server"""
+        """Handle different message types from server (runs on the Tk thread)"""
         msg_type = message['type']
         
         if msg_type == 'waiting':
             self.player_symbol = message['player']
             self.game_id = message['game_id']
-            self.root.after(0, lambda: self.update_status(message['message']))
+            self.update_status(message['message'])
             
         elif msg_type == 'start':
             self.player_symbol = message['player']
@@ -239,41 +317,46 @@ class GomokuClient:
             self.my_turn = (self.player_symbol == 'X')
             
             status = f"You are {self.player_symbol}. " + ("Your turn!" if self.my_turn else "Opponent's turn")
-            self.root.after(0, lambda: self.update_status(status))
-            self.root.after(0, lambda: self.new_game_button.config(state=tk.NORMAL))
+            self.update_status(status)
+            self.new_game_button.config(state=tk.NORMAL)
             
         elif msg_type == 'opponent_move':
             row, col = message['row'], message['col']
             player = message['player']
             
             self.game.make_move(row, col, player)
-            self.root.after(0, lambda: self.draw_stone(row, col, player))
+            self.draw_stone(row, col, player)
             
             # Don't check game_over here - let the server's game_over message handle it
             # This prevents duplicate "You lose!" messages
             if not self.game.game_over:
                 self.my_turn = True
-                self.root.after(0, lambda: self.update_status("Your turn!"))
+                self.update_status("Your turn!")
             
         elif msg_type == 'game_over':
             winner = message['winner']
             self.my_turn = False
             you_won = (winner == self.player_symbol)
-            self.root.after(0, lambda: self.show_game_over(you_won))
+            self.show_game_over(you_won)
             
         elif msg_type == 'reset':
-            self.root.after(0, self.reset_board)
+            self.reset_board()
             
         elif msg_type == 'waiting_for_opponent':
             msg = message.get('message', 'Waiting for opponent...')
-            self.root.after(0, lambda: self.update_status(msg))
+            self.update_status(msg)
             
         elif msg_type == 'opponent_disconnected':
-            self.root.after(0, lambda: messagebox.showinfo("Game Over", message['message']))
-            self.root.after(0, self.quit_game)
+            messagebox.showinfo("Game Over", message['message'])
+            self.quit_game()
             
         elif msg_type == 'error':
-            self.root.after(0, lambda: messagebox.showerror("Error", message['message']))
+            messagebox.showerror("Error", message['message'])
+    
+    def send_message(self, message):
+        """Send length-prefixed JSON message to server"""
+        data = json_codec.dumps(message)
+        self.socket.sendall(HEADER.pack(len(data)) + data)
     
     def send_move(self, row, col):
         """Send move to server"""
@@ -282,13 +365,8 @@ class GomokuClient:
             return
         
         try:
-            message = {
-                'type': 'move',
-                'row': row,
-                'col': col
-            }
-            data = json.dumps(message).encode('utf-8')
-            self.socket.send(data)
+            # Moves use the compact binary frame instead of JSON
+            self.socket.sendall(MOVE_FRAME.pack(MOVE_SIZE, MOVE_TAG, row, col))
         except socket.error as se:
             messagebox.showerror("Network Error", f"Failed to send move: {se}")
             self.connected = False
@@ -301,8 +379,7 @@ class GomokuClient:
         self.new_game_button.config(state=tk.DISABLED)
         try:
             message = {'type': 'reset'}
-            data = json.dumps(message).encode('utf-8')
-            self.socket.send(data)
+            self.send_message(message)
             self.update_status("Waiting for opponent to click New Game...")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to request new game: {e}")
@@ -310,8 +387,7 @@ class GomokuClient:
     
     def reset_board(self):
         """Reset the board for new game"""
-        self.canvas.delete('all')
-        self.draw_board()
+        self.canvas.itemconfigure('stone', state='hidden')
         self.game.reset()
         self.my_turn = (self.player_symbol == 'X')
         status = f"New game! You are {self.player_symbol}. " + ("Your turn!" if self.my_turn else "Opponent's turn")
@@ -361,6 +437,7 @@ class GomokuClient:
             self.socket.settimeout(5)
             self.socket.connect((self.host, self.port))
             self.socket.settimeout(None)
+            self.configure_socket()
             self.connected = True
             self.reconnect_attempts = 0
             
@@ -389,18 +466,21 @@ class GomokuClient:
         if self.connected:
             try:
                 message = {'type': 'disconnect'}
-                data = json.dumps(message).encode('utf-8')
-                self.socket.send(data)
+                self.send_message(message)
                 self.socket.close()
             except:
                 pass
         
+        if self._drain_id is not None:
+            self.root.after_cancel(self._drain_id)
+            self._drain_id = None
         self.root.quit()
         self.root.destroy()
     
     def run(self):
         """Run the client"""
         self.root.protocol("WM_DELETE_WINDOW", self.quit_game)
+        self.drain_inbox()
         self.root.mainloop()
 
 
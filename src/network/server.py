@@ -3,15 +3,93 @@ Gomoku Game Server
 Handles multiple clients and game rooms
 """
 
+import selectors
+import signal
 import socket
-import threading
-import json
+import struct
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from game import GomokuGame
+import json_codec
+
+# Every message is a 4-byte big-endian length followed by that many bytes of JSON
+HEADER = struct.Struct('>I')
+# ...except moves from clients, which are a whole frame of their own: the
+# header, then a tag byte (JSON payloads start with '{'), row, col and a
+# reserved byte
+MOVE_TAG = 0x01
+MOVE_FRAME = struct.Struct('>IBBBx')
+MOVE_SIZE = MOVE_FRAME.size - HEADER.size
+# Game messages are tiny; a larger length prefix means a broken or hostile peer
+MAX_FRAME_SIZE = 64 * 1024
+# Unsent bytes a client may leave queued; one that stops reading is dropped
+# rather than allowed to grow the server's memory without bound
+MAX_OUTBOX_SIZE = 256 * 1024
+# Initial per-connection receive buffer; many frames fit in one read
+RECV_BUFFER_SIZE = 8192
+# Connections the kernel may queue before accept_client gets to them
+LISTEN_BACKLOG = 128
+# Clients served at once; further connections are turned away
+MAX_CLIENTS = 256
+
+
+def encode_frame(message) -> bytes:
+    """Encode a message as one length-prefixed frame"""
+    data = json_codec.dumps(message)
+    return HEADER.pack(len(data)) + data
+
+
+# Replies that never change are encoded once
+RESET_FRAME = encode_frame({'type': 'reset', 'message': 'New game started!'})
+WAITING_FOR_OPPONENT_FRAME = encode_frame({'type': 'waiting_for_opponent', 'message': 'Waiting...'})
+INVALID_MOVE_FRAME = encode_frame({'type': 'error', 'message': 'Invalid move'})
+SERVER_FULL_FRAME = encode_frame({'type': 'error', 'message': 'Server is full, try again later'})
+OPPONENT_DISCONNECTED_FRAME = encode_frame({'type': 'opponent_disconnected', 'message': 'Opponent disconnected'})
+
+
+@lru_cache(maxsize=None)
+def opponent_move_frame(player, row, col) -> bytes:
+    """
+    Frame relaying a move to the opponent
+    
+    Only moves the game accepted get here, so there are at most two frames
+    per board cell and each is encoded once.
+    """
+    return encode_frame({'type': 'opponent_move', 'row': row, 'col': col, 'player': player})
+
+
+# Game over notices only vary by winner, so every one is encoded up front
+WIN_FRAMES = {
+    player: encode_frame({'type': 'game_over', 'winner': player, 'message': 'You win!'})
+    for player in ('X', 'O')
+}
+LOSE_FRAMES = {
+    player: encode_frame({'type': 'game_over', 'winner': player, 'message': 'You lose!'})
+    for player in ('X', 'O')
+}
+
+
+class Connection:
+    """State the event loop keeps for one connected client"""
+    
+    def __init__(self, client_socket, address):
+        self.socket = client_socket
+        self.address = address
+        self.game_id = None
+        self.player_symbol = None
+        # Bound once at pairing so handlers need no dictionary lookups
+        self.room = None      # self.games[game_id] while seated
+        self.opponent = None  # The other player's Connection once started
+        # Reads land directly in recv_buf; its first recv_len bytes are
+        # frames not yet handled (the buffer grows if one frame needs more)
+        self.recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self.recv_len = 0
+        self.outbox = bytearray()    # Bytes the socket would not take yet
+        self.closed = False
 
 
 class GameServer:
@@ -21,19 +99,38 @@ class GameServer:
         self.host = host
         self.port = port
         self.server_socket = None
+        # One thread serves every client: sockets are non-blocking and the
+        # selector reports which ones can be read or written
+        self.selector = selectors.DefaultSelector()
         self.games = {}  # game_id -> game instance
-        self.waiting_player = None  # Player waiting for opponent
+        # Games of closed rooms, reset and kept for the next room: their
+        # board and move caches are reused instead of rebuilt. Never larger
+        # than the most rooms open at once (bounded by MAX_CLIENTS).
+        self.free_games = []
+        self.waiting_player = None  # Connection waiting for opponent
         self.game_counter = 0
-        self.ready_players = {}  # game_id -> set of ready player symbols
+        self.client_count = 0
         
     def start(self):
         """Start the server"""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # Set timeout to make server responsive to CTRL-C
-        self.server_socket.settimeout(1.0)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(LISTEN_BACKLOG)
+        self.server_socket.setblocking(False)
+        self.selector.register(self.server_socket, selectors.EVENT_READ, None)
+        
+        # CTRL-C wakes the selector: Python writes a byte to wakeup_write for
+        # every signal, so select() can block without polling. Only the main
+        # thread may do this, and only it receives KeyboardInterrupt anyway.
+        wakeup_read, wakeup_write = socket.socketpair()
+        wakeup_read.setblocking(False)
+        wakeup_write.setblocking(False)
+        self.selector.register(wakeup_read, selectors.EVENT_READ, None)
+        try:
+            previous_wakeup_fd = signal.set_wakeup_fd(wakeup_write.fileno())
+        except ValueError:
+            previous_wakeup_fd = None
         
         print(f"[SERVER] Started on {self.host}:{self.port}")
         print("[SERVER] Waiting for connections...")
@@ -41,210 +138,308 @@ class GameServer:
         
         try:
             while True:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    print(f"[SERVER] New connection from {address}")
-                    
-                    # Create thread for each client
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    # Timeout allows checking for KeyboardInterrupt
-                    continue
+                for key, mask in self.selector.select():
+                    if key.fileobj is wakeup_read:
+                        # The signal handler itself raises KeyboardInterrupt
+                        wakeup_read.recv(64)
+                    elif key.data is None:
+                        self.accept_client()
+                    else:
+                        self.service_client(key.data, mask)
         except KeyboardInterrupt:
             print("\n[SERVER] Shutting down...")
         finally:
-            self.server_socket.close()
+            if previous_wakeup_fd is not None:
+                signal.set_wakeup_fd(previous_wakeup_fd)
+            for key in list(self.selector.get_map().values()):
+                key.fileobj.close()
+            self.selector.close()
+            wakeup_write.close()
             print("[SERVER] Server stopped")
     
-    def handle_client(self, client_socket, address):
-        """Handle individual client connection"""
-        game_id = None
-        player_symbol = None
-        opponent_socket = None
-        
+    def accept_client(self):
+        """Accept a pending connection and pair it with an opponent"""
         try:
-            # Match players
-            if self.waiting_player is None:
-                # First player - wait for opponent
-                # Create new game
-                game_id = self.game_counter
-                self.game_counter += 1
-                
-                self.waiting_player = {
-                    'socket': client_socket,
-                    'address': address,
-                    'game_id': game_id  # CRITICAL: Store game_id for the second player
-                }
-                player_symbol = 'X'
-                self.games[game_id] = {
-                    'game': GomokuGame(),
-                    'player_X': client_socket,
-                    'player_O': None
-                }
-                
-                self.send_message(client_socket, {
-                    'type': 'waiting',
-                    'player': player_symbol,
-                    'game_id': game_id,
-                    'message': 'Waiting for opponent...'
-                })
-                
-                print(f"[SERVER] Player X waiting in game {game_id}")
-                
-                # Wait for opponent (blocking)
-                while self.games[game_id]['player_O'] is None:
-                    threading.Event().wait(0.1)
-                
-                opponent_socket = self.games[game_id]['player_O']
-                
-            else:
-                # Second player - start game
-                player_symbol = 'O'
-                game_id = self.waiting_player['game_id']
-                
-                self.games[game_id]['player_O'] = client_socket
-                opponent_socket = self.games[game_id]['player_X']
-                
-                # Notify both players
-                self.send_message(client_socket, {
-                    'type': 'start',
-                    'player': player_symbol,
-                    'game_id': game_id,
-                    'message': 'Game starting! You are O'
-                })
-                
-                self.send_message(opponent_socket, {
-                    'type': 'start',
-                    'player': 'X',
-                    'game_id': game_id,
-                    'message': 'Game starting! You are X (you go first)'
-                })
-                
-                print(f"[SERVER] Game {game_id} started!")
-                self.waiting_player = None
+            client_socket, address = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        print(f"[SERVER] New connection from {address}")
+        
+        if self.client_count >= MAX_CLIENTS:
+            print(f"[SERVER] Server full, refusing {address}")
+            try:
+                client_socket.send(SERVER_FULL_FRAME)
+            except OSError:
+                pass
+            client_socket.close()
+            return
+        self.client_count += 1
+        
+        client_socket.setblocking(False)
+        # Moves are tiny; send each at once instead of letting Nagle hold it
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = Connection(client_socket, address)
+        self.selector.register(client_socket, selectors.EVENT_READ, conn)
+        self.match_player(conn)
+    
+    def match_player(self, conn):
+        """Seat a new player: open a game, or join the one that is waiting"""
+        if self.waiting_player is None:
+            # First player - wait for opponent
+            # Create new game
+            game_id = self.game_counter
+            self.game_counter += 1
             
-            # Game loop
-            game = self.games[game_id]['game']
+            conn.game_id = game_id
+            conn.player_symbol = 'X'
+            self.waiting_player = conn
+            conn.room = self.games[game_id] = {
+                'game': self.free_games.pop() if self.free_games else GomokuGame(),
+                'player_X': conn,
+                'player_O': None,
+                'ready': set()  # Symbols of players who asked for a new game
+            }
             
-            while True:
-                data = client_socket.recv(4096)
-                if not data:
-                    break
-                
-                message = json.loads(data.decode('utf-8'))
-                
-                if message['type'] == 'move':
-                    row, col = message['row'], message['col']
-                    
-                    # Validate move
-                    if game.make_move(row, col, player_symbol):
-                        # Check if game over BEFORE sending to opponent
-                        # This prevents both players from triggering game_over
-                        game_is_over = game.game_over
-                        
-                        # Send move to opponent
-                        self.send_message(opponent_socket, {
-                            'type': 'opponent_move',
-                            'row': row,
-                            'col': col,
-                            'player': player_symbol
-                        })
-                        
-                        # Send game over messages if game ended
-                        if game_is_over:
-                            # Clear ready status when game ends
-                            if game_id in self.ready_players:
-                                self.ready_players[game_id].clear()
-                            
-                            self.send_message(client_socket, {
-                                'type': 'game_over',
-                                'winner': game.winner,
-                                'message': 'You win!'
-                            })
-                            self.send_message(opponent_socket, {
-                                'type': 'game_over',
-                                'winner': game.winner,
-                                'message': 'You lose!'
-                            })
-                            # Don't break - continue listening for reset message
-                    else:
-                        self.send_message(client_socket, {
-                            'type': 'error',
-                            'message': 'Invalid move'
-                        })
-                
-                elif message['type'] == 'reset':
-                    # Track ready players
-                    if game_id not in self.ready_players:
-                        self.ready_players[game_id] = set()
-                    
-                    self.ready_players[game_id].add(player_symbol)
-                    print(f"[SERVER] Player {player_symbol} ready for new game in game {game_id}")
-                    print(f"[SERVER] Ready players for game {game_id}: {self.ready_players[game_id]}")
-                    
-                    # Check if both players are ready
-                    if len(self.ready_players[game_id]) == 2:
-                        # Both players ready - start new game
-                        game.reset()
-                        self.ready_players[game_id].clear()
-                        print(f"[SERVER] Game {game_id} reset - both players ready")
-                        
-                        # Notify both players
-                        self.send_message(client_socket, {
-                            'type': 'reset',
-                            'message': 'New game started!'
-                        })
-                        self.send_message(opponent_socket, {
-                            'type': 'reset',
-                            'message': 'New game started!'
-                        })
-                    else:
-                        # Only one player ready - notify waiting
-                        self.send_message(client_socket, {
-                            'type': 'waiting_for_opponent',
-                            'message': 'Waiting...'
-                        })
-                
-                elif message['type'] == 'disconnect':
-                    break
-                    
+            self.send_message(conn, {
+                'type': 'waiting',
+                'player': 'X',
+                'game_id': game_id,
+                'message': 'Waiting for opponent...'
+            })
+            
+            print(f"[SERVER] Player X waiting in game {game_id}")
+            
+        else:
+            # Second player - start game
+            opponent = self.waiting_player
+            game_id = opponent.game_id
+            self.waiting_player = None
+            
+            conn.game_id = game_id
+            conn.player_symbol = 'O'
+            conn.room = opponent.room
+            conn.room['player_O'] = conn
+            conn.opponent = opponent
+            opponent.opponent = conn
+            
+            # Notify both players
+            self.send_message(conn, {
+                'type': 'start',
+                'player': 'O',
+                'game_id': game_id,
+                'message': 'Game starting! You are O'
+            })
+            
+            self.send_message(opponent, {
+                'type': 'start',
+                'player': 'X',
+                'game_id': game_id,
+                'message': 'Game starting! You are X (you go first)'
+            })
+            
+            print(f"[SERVER] Game {game_id} started!")
+    
+    def service_client(self, conn, mask):
+        """Handle a readiness event for one client"""
+        if conn.closed:
+            # Dropped while handling an earlier event of the same select
+            return
+        try:
+            if mask & selectors.EVENT_WRITE:
+                self.flush_outbox(conn)
+            if mask & selectors.EVENT_READ and not conn.closed:
+                self.read_client(conn)
         except Exception as e:
-            print(f"[SERVER] Error with {address}: {e}")
+            print(f"[SERVER] Error with {conn.address}: {e}")
+            self.close_client(conn)
+    
+    def read_client(self, conn):
+        """
+        Read what the client has sent and handle every complete message
         
-        finally:
-            # Clean up
-            if game_id is not None and game_id in self.games:
-                # Notify opponent
-                if opponent_socket:
-                    try:
-                        self.send_message(opponent_socket, {
-                            'type': 'opponent_disconnected',
-                            'message': 'Opponent disconnected'
-                        })
-                    except:
-                        pass
+        A frame announcing more than MAX_FRAME_SIZE bytes raises ValueError
+        instead of being buffered.
+        """
+        buf = conn.recv_buf
+        if conn.recv_len == len(buf):
+            # Full with one partial frame (bounded by MAX_FRAME_SIZE)
+            buf.extend(bytes(len(buf)))
+        n = conn.socket.recv_into(memoryview(buf)[conn.recv_len:])
+        if not n:
+            self.close_client(conn)
+            return
+        filled = conn.recv_len + n
+        
+        # A read may hold several messages or only part of one
+        start = 0
+        while filled - start >= HEADER.size and not conn.closed:
+            (length,) = HEADER.unpack_from(buf, start)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"frame of {length} bytes exceeds {MAX_FRAME_SIZE}")
+            end = start + HEADER.size + length
+            if end > filled:
+                break
+            if length == MOVE_SIZE and buf[start + HEADER.size] == MOVE_TAG:
+                # Binary move: the two coordinates are read straight from the buffer
+                _, _, row, col = MOVE_FRAME.unpack_from(buf, start)
+                start = end
+                self.handle_move(conn, row, col)
+                continue
+            message = json_codec.loads(buf[start + HEADER.size:end])
+            start = end
+            self.handle_message(conn, message)
+        
+        # Move the unfinished tail to the front for the next read
+        if start:
+            buf[:filled - start] = buf[start:filled]
+        conn.recv_len = filled - start
+    
+    def handle_message(self, conn, message):
+        """Act on one JSON message from a client"""
+        if message['type'] == 'disconnect':
+            self.close_client(conn)
+        elif message['type'] == 'move':
+            self.handle_move(conn, message['row'], message['col'])
+        elif message['type'] == 'reset':
+            self.handle_reset(conn)
+    
+    def handle_move(self, conn, row, col):
+        """Play a move for a client and relay it to the opponent"""
+        opponent = conn.opponent
+        if opponent is None:
+            # Still waiting for an opponent, or the game has ended
+            return
+        game = conn.room['game']
+        player_symbol = conn.player_symbol
+        
+        # Validate move
+        if game.make_move(row, col, player_symbol):
+            # Check if game over BEFORE sending to opponent
+            # This prevents both players from triggering game_over
+            game_is_over = game.game_over
+            
+            move_frame = opponent_move_frame(player_symbol, row, col)
+            
+            # Send game over messages if game ended
+            if game_is_over:
+                # Clear ready status when game ends
+                conn.room['ready'].clear()
                 
-                # Remove game
-                del self.games[game_id]
+                # The opponent gets the final move and the result in one send
+                self.send_frame(opponent, move_frame + LOSE_FRAMES[game.winner])
+                self.send_frame(conn, WIN_FRAMES[game.winner])
+                # Keep the room - the players may still ask for a reset
+            else:
+                # Send move to opponent
+                self.send_frame(opponent, move_frame)
+        else:
+            self.send_frame(conn, INVALID_MOVE_FRAME)
+    
+    def handle_reset(self, conn):
+        """Mark a client ready for a new game; start it once both are"""
+        opponent = conn.opponent
+        if opponent is None:
+            return
+        room = conn.room
+        ready = room['ready']
+        game_id = conn.game_id
+        player_symbol = conn.player_symbol
+        
+        # Track ready players
+        ready.add(player_symbol)
+        print(f"[SERVER] Player {player_symbol} ready for new game in game {game_id}")
+        print(f"[SERVER] Ready players for game {game_id}: {ready}")
+        
+        # Check if both players are ready
+        if len(ready) == 2:
+            # Both players ready - start new game
+            room['game'].reset()
+            ready.clear()
+            print(f"[SERVER] Game {game_id} reset - both players ready")
             
-            if self.waiting_player and self.waiting_player['socket'] == client_socket:
-                self.waiting_player = None
+            # Notify both players
+            self.send_frame(conn, RESET_FRAME)
+            self.send_frame(opponent, RESET_FRAME)
+        else:
+            # Only one player ready - notify waiting
+            self.send_frame(conn, WAITING_FOR_OPPONENT_FRAME)
+    
+    def close_client(self, conn):
+        """Drop a client, ending its game and telling the opponent"""
+        if conn.closed:
+            return
+        conn.closed = True
+        self.client_count -= 1
+        
+        if conn.room is not None:
+            del self.games[conn.game_id]
+            game = conn.room['game']
+            game.reset()
+            self.free_games.append(game)
             
-            client_socket.close()
-            print(f"[SERVER] Connection closed: {address}")
+            # Notify opponent
+            opponent = conn.opponent
+            if opponent is not None:
+                opponent.room = opponent.opponent = None
+                self.send_frame(opponent, OPPONENT_DISCONNECTED_FRAME)
+            conn.room = conn.opponent = None
+        
+        if self.waiting_player is conn:
+            self.waiting_player = None
+        
+        self.selector.unregister(conn.socket)
+        conn.socket.close()
+        print(f"[SERVER] Connection closed: {conn.address}")
+    
+    def send_message(self, conn, message):
+        """Send length-prefixed JSON message to client"""
+        self.send_frame(conn, encode_frame(message))
     
-    def send_message(self, client_socket, message):
-        """Send JSON message to client"""
+    def send_frame(self, conn, frame):
+        """
+        Send an already encoded frame to client
+        
+        Whatever the socket does not accept right away is queued and written
+        when the selector reports the socket writable, so a slow client never
+        stalls the loop. A client whose queue would pass MAX_OUTBOX_SIZE is
+        not reading and gets disconnected.
+        """
+        if conn.closed:
+            return
+        if conn.outbox:
+            # Earlier bytes are still queued; keep them in order
+            self.queue_frame(conn, frame)
+            return
+        
         try:
-            data = json.dumps(message).encode('utf-8')
-            client_socket.send(data)
-        except Exception as e:
+            sent = conn.socket.send(frame)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
             print(f"[SERVER] Error sending message: {e}")
+            return
+        
+        if sent < len(frame):
+            self.selector.modify(conn.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, conn)
+            self.queue_frame(conn, memoryview(frame)[sent:])
+    
+    def queue_frame(self, conn, data):
+        """Append unsent bytes to the outbox, dropping a client that lets it overflow"""
+        if len(conn.outbox) + len(data) > MAX_OUTBOX_SIZE:
+            print(f"[SERVER] Dropping {conn.address}: over {MAX_OUTBOX_SIZE} bytes unsent")
+            self.close_client(conn)
+            return
+        conn.outbox += data
+    
+    def flush_outbox(self, conn):
+        """Write queued bytes; stop watching for writability once empty"""
+        try:
+            sent = conn.socket.send(conn.outbox)
+        except BlockingIOError:
+            return
+        del conn.outbox[:sent]
+        if not conn.outbox:
+            self.selector.modify(conn.socket, selectors.EVENT_READ, conn)
 
 
 if __name__ == "__main__":
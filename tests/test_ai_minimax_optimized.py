@@ -0,0 +1,84 @@
+"""
+Tests for the optimized Minimax AI search
+"""
+
+import contextlib
+import io
+import unittest
+
+from src.game import GomokuGame
+from src.ai_minimax_optimized import MinimaxAI, _INF
+
+
+# Stones placed alternately X, O, ... ; each position once came back from
+# a failed aspiration pass with a different score than a cold search
+POSITIONS = [
+    [(9, 4), (10, 7), (4, 8), (9, 5), (4, 7)],
+    [(10, 6), (8, 8), (9, 8), (9, 10), (10, 5), (4, 7)],
+    [(7, 7), (10, 7), (10, 10), (5, 9), (8, 6)],
+    [(9, 8), (9, 7), (8, 6), (10, 4), (7, 5), (5, 6)],
+]
+
+DEPTH = 3
+
+
+class TestAspirationResearch(unittest.TestCase):
+    """A failed aspiration window must not poison the full re-search"""
+
+    def new_ai(self, game):
+        ai = MinimaxAI(game, player='O', depth=DEPTH, time_limit=60)
+        ai.deadline = float('inf')
+        ai.reset_heuristics()
+        return ai
+
+    def test_research_after_failed_window_matches_cold_search(self):
+        for stones in POSITIONS:
+            with self.subTest(stones=stones):
+                game = GomokuGame()
+                for i, (row, col) in enumerate(stones):
+                    game.make_move(row, col, 'XO'[i % 2])
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    cold = self.new_ai(game)
+                    cold.get_best_move_at_depth(DEPTH)
+
+                    # Fail low: the whole window lies above the true score
+                    ai = self.new_ai(game)
+                    ai.get_best_move_at_depth(DEPTH, cold.last_score + 5,
+                                              cold.last_score + 300)
+                    ai.get_best_move_at_depth(DEPTH)
+
+                self.assertEqual(ai.last_score, cold.last_score)
+
+
+class TestFiveAtHorizon(unittest.TestCase):
+    """A five made by the last move ends the game, whatever the mover holds"""
+
+    def test_quiescence_scores_completed_five_as_loss_for_mover(self):
+        game = GomokuGame()
+        for col in range(5):
+            game.place(7, col, 'X')
+        for col in range(4):
+            game.place(9, col, 'O')
+
+        ai = MinimaxAI(game, player='O', depth=4, time_limit=60)
+        ai.deadline = float('inf')
+        self.assertEqual(ai.quiescence(-_INF, _INF, True, None, 4), -ai.FIVE)
+        self.assertEqual(ai.minimax(0, -_INF, _INF, True), -ai.FIVE)
+
+    def test_blocks_open_three_instead_of_trusting_own_four(self):
+        game = GomokuGame()
+        stones = [(7, 7), (6, 7), (6, 6), (8, 8), (7, 6), (7, 8), (5, 6)]
+        for i, (row, col) in enumerate(stones):
+            game.make_move(row, col, 'XO'[i % 2])
+
+        ai = MinimaxAI(game, player='O', depth=4, time_limit=60)
+        with contextlib.redirect_stdout(io.StringIO()):
+            move = ai.make_move()
+
+        # X's open three on column 6 runs (5, 6) to (7, 6)
+        self.assertIn(move, [(4, 6), (8, 6)])
+
+
+if __name__ == '__main__':
+    unittest.main()